@@ -4,6 +4,11 @@ DnaOptimizationProblem is where the whole problem is defined: sequence,
 constraints, objectives.
 """
 
+import copy
+import multiprocessing
+import time
+
+import numpy as np
 from Bio.SeqRecord import SeqRecord
 from Bio import SeqIO
 
@@ -16,6 +21,10 @@ from .SpecEvaluation import (ProblemObjectivesEvaluations,
                              ProblemConstraintsEvaluations)
 from .Location import Location
 from .MutationSpace import MutationSpace
+from .SequenceState import SequenceState
+from .SearchStrategies import HillClimbing
+from .EvaluationCache import EvaluationCache
+from .SpecificationsIndex import SpecificationsIndex
 from proglog import TqdmProgressBarLogger, MuteProgressBarLogger
 
 _default_bars = ('objective', 'constraint', 'location', 'mutation')
@@ -89,11 +98,28 @@ class DnaOptimizationProblem:
       Either None for no logger, 'bar' for a tqdm progress bar logger, or
       any ProgLog progress bar logger.
 
+    mutation_space
+      A MutationSpace for the problem. If None, it is computed from the
+      constraints.
+
+    mutation_space_cache
+      An optional ``MutationSpaceCache``. If provided (and no
+      ``mutation_space`` is given), the mutation space is loaded from this
+      on-disk cache when the same sequence and nucleotide-restricting
+      constraints have been seen before, and stored in it otherwise.
+
     Attributes
     ----------
 
     sequence
-      The sequence
+      The sequence (a string, computed from ``sequence_state`` when needed)
+
+    sequence_state
+      A ``SequenceState`` holding the sequence as a mutable array, on which
+      mutations are applied and reverted during the search.
+
+    sequence_array
+      A numpy uint8 array of the sequence's ASCII codes (not a copy).
 
     constraints
       The list of constraints
@@ -105,6 +131,23 @@ class DnaOptimizationProblem:
       A dictionnary indicating the possible mutations. Note that this is only
       computed the first time that canvas.possible_mutations is invoked.
 
+    constraints_stats
+      A dict ``{constraint_class_name: [n_evaluations, n_failures, time]}``
+      of statistics used by ``all_constraints_pass`` to test the constraints
+      in the most efficient order. It is shared with the local problems.
+
+    evaluation_cache
+      An ``EvaluationCache`` memoizing the evaluations of the specifications
+      on local subsequences (see its ``hits`` and ``misses`` counters). It is
+      shared with the local problems, and its size is set by the class
+      attribute ``evaluation_cache_size``.
+
+    random_generator
+      The numpy random Generator used to draw random mutations. It is seeded
+      from ``np.random`` when the problem is created (so that results are
+      reproducible after ``np.random.seed(...)``) and shared with the local
+      problems.
+
     Notes
     -----
 
@@ -118,12 +161,19 @@ class DnaOptimizationProblem:
     """
 
     randomization_threshold = 10000
+    dispatch_samples = 10
+    max_resolution_passes = 3
     max_random_iters = 1000
     n_mutations = 2
+    random_batch_size = 1
+    search_strategy = HillClimbing()
+    max_random_time = None
+    evaluation_cache_size = 2000
     local_extensions = (0, 5)
 
     def __init__(self, sequence, constraints=None, objectives=None,
-                 logger='bar', mutation_space=None):
+                 logger='bar', mutation_space=None,
+                 mutation_space_cache=None):
         """Initialize"""
         if isinstance(sequence, SeqRecord):
             self.record = sequence
@@ -141,8 +191,31 @@ class DnaOptimizationProblem:
             logger = MuteProgressBarLogger(min_time_interval=0.2) # silent logger
         self.logger = logger
         self.mutation_space = mutation_space
+        self.mutation_space_cache = mutation_space_cache
+        self.constraints_stats = {}
+        self.evaluation_cache = EvaluationCache(
+            max_size=self.evaluation_cache_size)
+        self.random_generator = np.random.default_rng(
+            np.random.randint(2 ** 31))
         self.initialize()
 
+    @property
+    def sequence(self):
+        """Return the current sequence of the problem, as a string."""
+        return self.sequence_state.sequence
+
+    @sequence.setter
+    def sequence(self, sequence):
+        if self.__dict__.get('sequence_state', None) is None:
+            self.sequence_state = SequenceState(sequence)
+        else:
+            self.sequence_state.set_sequence(sequence)
+
+    @property
+    def sequence_array(self):
+        """Return the sequence as a uint8 array of ASCII codes (no copy)."""
+        return self.sequence_state.array
+
     def initialize(self):
         """Variables initialization before solving."""
 
@@ -158,8 +231,17 @@ class DnaOptimizationProblem:
         self.sequence_before = self.sequence
         self._constraints_before = None
         self._objectives_before = None
+        self._specifications_indices = {
+            'constraint': SpecificationsIndex(self.constraints),
+            'objective': SpecificationsIndex(self.objectives)
+        }
         if self.mutation_space is None:
-            self.mutation_space = MutationSpace.from_optimization_problem(self)
+            if self.mutation_space_cache is None:
+                self.mutation_space = \
+                    MutationSpace.from_optimization_problem(self)
+            else:
+                self.mutation_space = \
+                    self.mutation_space_cache.mutation_space(self)
             self.sequence = self.mutation_space.constrain_sequence(
                 self.sequence)
 
@@ -181,15 +263,75 @@ class DnaOptimizationProblem:
             self.sequence = sequence
         return self._objectives_before
 
-    def constraints_evaluations(self):
+    def specifications_overlapping(self, location, role="constraint"):
+        """Return the constraints or objectives which can be relevant at the
+        location, i.e. which do not localize to a void specification there.
+
+        The specifications are found via a ``SpecificationsIndex``, which is
+        rebuilt if ``self.constraints`` or ``self.objectives`` was replaced
+        or changed length since the index was built.
+        """
+        specifications = {"constraint": self.constraints,
+                          "objective": self.objectives}[role]
+        indices = self.__dict__.setdefault('_specifications_indices', {})
+        index = indices.get(role, None)
+        if (index is None) or not index.is_index_of(specifications):
+            index = indices[role] = SpecificationsIndex(specifications)
+        return index.overlapping(location)
+
+    def constraints_evaluations(self, changed_segments=None,
+                                previous_evaluations=None):
         """Return a list of the evaluations of each constraint of the canvas.
+
+        If ``previous_evaluations`` (evaluations of the constraints before
+        the mutations in ``changed_segments``) is provided, only the windows
+        affected by the mutations are re-evaluated.
         """
-        return ProblemConstraintsEvaluations.from_problem(self)
+        return ProblemConstraintsEvaluations.from_problem(
+            self, changed_segments=changed_segments,
+            previous_evaluations=previous_evaluations)
 
     def all_constraints_pass(self):
         """Return True iff the current problem sequence passes all constraints.
+
+        The constraints are tested one by one with ``constraint.passes``,
+        which builds no evaluation message or locations (results are memoized
+        in ``self.evaluation_cache``), and the test stops at the first
+        failing constraint. Constraints are tested by increasing
+        ``average_time / failure_rate``, as observed in the previous calls
+        and recorded in ``self.constraints_stats``, so that cheap and often
+        failing constraints are tested first.
+        """
+        stats = self.constraints_stats
+        for constraint in sorted(self.constraints, key=self._constraint_cost):
+            key = constraint.__class__.__name__
+            if key not in stats:
+                stats[key] = [0, 0, 0.0]
+            constraint_stats = stats[key]
+            t0 = time.time()
+            passes = self.evaluation_cache.passes(constraint, self)
+            constraint_stats[0] += 1
+            constraint_stats[2] += time.time() - t0
+            if not passes:
+                constraint_stats[1] += 1
+                return False
+        return True
+
+    def _constraint_cost(self, constraint):
+        """Return the expected cost of testing the constraint, per failure.
+
+        This is the constraint's average evaluation time divided by its
+        failure rate (with a +1/+2 smoothing, so that constraints never
+        evaluated before come first).
         """
-        return self.constraints_evaluations().all_evaluations_pass()
+        key = constraint.__class__.__name__
+        if key not in self.constraints_stats:
+            return 0
+        n_evaluations, n_failures, total_time = self.constraints_stats[key]
+        if n_evaluations == 0:
+            return 0
+        failure_rate = (n_failures + 1.0) / (n_evaluations + 2.0)
+        return total_time / (n_evaluations * failure_rate)
 
     def constraints_text_summary(self, failed_only=False):
         evals = self.constraints_evaluations()
@@ -197,9 +339,15 @@ class DnaOptimizationProblem:
             evals = evals.filter("failing")
         return evals.to_text()
 
-    def objectives_evaluations(self):
-        """Return a list of the evaluation of each objective of the canvas"""
-        return ProblemObjectivesEvaluations.from_problem(self)
+    def objectives_evaluations(self, changed_segments=None,
+                               previous_evaluations=None):
+        """Return a list of the evaluation of each objective of the canvas.
+
+        See ``constraints_evaluations`` for the incremental evaluation.
+        """
+        return ProblemObjectivesEvaluations.from_problem(
+            self, changed_segments=changed_segments,
+            previous_evaluations=previous_evaluations)
 
     def objective_scores_sum(self):
         return self.objectives_evaluations().scores_sum()
@@ -207,25 +355,30 @@ class DnaOptimizationProblem:
     def objectives_text_summary(self):
         return self.objectives_evaluations().to_text()
 
-    def resolve_constraints_by_exhaustive_search(self):
+    def resolve_constraints_by_exhaustive_search(self, pruning=True):
         """Solve all constraints by exploring the whole search space.
 
-        This method iterates over ``self.iter_mutations_space()`` (space of
-        all sequences that could be reached through successive mutations) and
-        stops when it finds a sequence which meets all the constraints of the
-        canvas.
+        This method iterates depth-first over the space of all sequences that
+        could be reached through successive mutations, and stops when it finds
+        a sequence which meets all the constraints of the canvas. If
+        ``pruning`` is True, partial assignments which already break a
+        constraint (see ``partial_sequence_can_be_pruned``) are not completed
+        (backtracking search).
         """
-        sequence_before = self.sequence
-        all_variants = self.mutation_space.all_variants(self.sequence)
-        space_size = int(self.mutation_space.space_size)
+        if pruning:
+            all_variants = self.mutation_space.all_variants_with_pruning(
+                self.sequence_state, prune=self.partial_sequence_can_be_pruned)
+        else:
+            all_variants = self.mutation_space.all_variants_in_place(
+                self.sequence_state)
+        space_size = self.mutation_space.space_size
+        space_size = int(space_size) if np.isfinite(space_size) else None
         self.logger(mutation__total=space_size)
         for variant in self.logger.iter_bar(mutation=all_variants):
-
-            self.sequence = variant
             if self.all_constraints_pass():
+                self.sequence_state.commit()
                 self.logger(mutation__index=space_size)
                 return
-        self.sequence = sequence_before
         raise NoSolutionError(
             "Exhaustive search failed to satisfy all constraints.",
             problem=self
@@ -260,21 +413,30 @@ class DnaOptimizationProblem:
             if all(e.passes for e in evaluations):
                 self.logger(mutation__index=iters)
                 return
-            previous_sequence = self.sequence
-            self.sequence = self.mutation_space.apply_random_mutations(
-                n_mutations=self.n_mutations, sequence=self.sequence)
-
-            evaluations = self.constraints_evaluations()
-            new_score = sum([
-                e.score
-                for e in evaluations
-                if not e.passes
-            ])
-
+            best_candidate = None
+            for candidate in range(self.random_batch_size):
+                mutations = self.mutation_space.pick_random_mutations(
+                    n_mutations=self.n_mutations, sequence=self.sequence_state,
+                    random_generator=self.random_generator)
+                self.sequence_state.apply_mutations(mutations)
+                new_evaluations = self.constraints_evaluations(
+                    changed_segments=[segment for segment, _ in mutations],
+                    previous_evaluations=evaluations)
+                new_score = sum([
+                    e.score
+                    for e in new_evaluations
+                    if not e.passes
+                ])
+                self.sequence_state.revert()
+                if (best_candidate is None) or (new_score > best_candidate[0]):
+                    best_candidate = (new_score, mutations, new_evaluations)
+
+            new_score, mutations, new_evaluations = best_candidate
             if new_score > score:
                 score = new_score
-            else:
-                self.sequence = previous_sequence
+                evaluations = new_evaluations
+                self.sequence_state.apply_mutations(mutations)
+                self.sequence_state.commit()
         raise NoSolutionError(
             "Random search did not find a solution in the given number of "
             "attempts. Try to increase the number of attempts with:\n\n"
@@ -284,21 +446,150 @@ class DnaOptimizationProblem:
             problem=self
         )
 
+    def search_costs_estimates(self):
+        """Estimate the time each search method takes to solve the constraints.
+
+        ``self.dispatch_samples`` random variants of the mutation space are
+        drawn to measure the time of a complete constraints check
+        (``t_check``), of an incremental evaluation of the constraints after
+        ``n_mutations`` random mutations (``t_delta``), and of a pruning test
+        (``t_prune``), and to estimate the fraction ``p`` of variants which
+        verify all constraints, and the fraction ``q`` of variants which are
+        not pruned by the constraints' ``score_upper_bound``. With ``N`` the
+        size of the mutation space, the expected costs are:
+
+        - Exhaustive search: ``min(N, 1 / p) * t_check``.
+        - Backtracking search: ``min(N, 1 / p) * (t_prune + q * t_check)``.
+        - Random search: ``random_batch_size * t_delta / p``.
+
+        Returns a dict ``{method: log10(cost_in_seconds)}`` (the costs are in
+        log space as ``N`` can be astronomically large). The backtracking
+        search is only in the dict if some constraint can prune partial
+        sequences.
+        """
+        choices = self.mutation_space.multichoices
+        variants = [list(choice.variants) for choice in choices]
+        prunable = self.specifications_have_score_bounds(self.constraints)
+        evaluations = self.constraints_evaluations()
+        n_samples = self.dispatch_samples
+        n_passing = n_not_pruned = 0
+        t_check = t_delta = t_prune = 0
+        for i in range(n_samples):
+            self.sequence_state.apply_mutations([
+                (choice.segment,
+                 choice_variants[self.random_generator.integers(
+                     len(choice_variants))])
+                for choice, choice_variants in zip(choices, variants)
+            ])
+            t0 = time.time()
+            n_passing += self.all_constraints_pass()
+            t_check += time.time() - t0
+            if prunable:
+                t0 = time.time()
+                n_not_pruned += not self.partial_sequence_can_be_pruned(
+                    choices[-1].segment)
+                t_prune += time.time() - t0
+            self.sequence_state.revert()
+            mutations = self.mutation_space.pick_random_mutations(
+                n_mutations=self.n_mutations, sequence=self.sequence_state,
+                random_generator=self.random_generator)
+            self.sequence_state.apply_mutations(mutations)
+            t0 = time.time()
+            self.constraints_evaluations(
+                changed_segments=[segment for segment, _ in mutations],
+                previous_evaluations=evaluations)
+            t_delta += time.time() - t0
+            self.sequence_state.revert()
+
+        # Average times (at least 0.1us, the resolution of some timers).
+        t_check, t_delta, t_prune = [
+            max(total_time / n_samples, 1e-7)
+            for total_time in (t_check, t_delta, t_prune)
+        ]
+        p = (n_passing + 0.5) / (n_samples + 1)
+        q = (n_not_pruned + 0.5) / (n_samples + 1)
+        log_n_checks = min(self.mutation_space.log_space_size, -np.log10(p))
+        costs = {
+            'exhaustive': log_n_checks + np.log10(t_check),
+            'random': np.log10(self.random_batch_size * t_delta / p)
+        }
+        if prunable:
+            costs['backtracking'] = log_n_checks + np.log10(t_prune +
+                                                            q * t_check)
+        return costs
+
+    def choose_search_method(self):
+        """Return the best method to solve the constraints in the local space.
+
+        Returns "exhaustive", "backtracking" (exhaustive search with pruning
+        of partial sequences), or "random". Spaces smaller than
+        ``randomization_threshold`` are always searched completely (with
+        backtracking if some constraint can prune partial sequences). For
+        larger spaces, the method with the lowest expected cost (see
+        ``search_costs_estimates``) is chosen, with ties going to the random
+        search. The choice is stored in the logger as ``search_method``.
+        """
+        log_space_size = self.mutation_space.log_space_size
+        if log_space_size < np.log10(self.randomization_threshold):
+            costs = None
+            if self.specifications_have_score_bounds(self.constraints):
+                method = 'backtracking'
+            else:
+                method = 'exhaustive'
+        else:
+            costs = self.search_costs_estimates()
+            method = min(['random', 'exhaustive', 'backtracking'],
+                         key=lambda m: costs.get(m, np.inf))
+        self.logger.store(search_method=method, search_costs=costs,
+                          log_space_size=log_space_size)
+        return method
+
     def resolve_constraints_locally(self):
         """Orient the local search towards a stochastic or exhaustive search.
+
+        The search method is chosen by ``choose_search_method``.
         """
-        if self.mutation_space.space_size < self.randomization_threshold:
-            self.resolve_constraints_by_exhaustive_search()
-        else:
+        method = self.choose_search_method()
+        if method == 'random':
             self.resolve_constraints_by_random_mutations()
+        else:
+            self.resolve_constraints_by_exhaustive_search(
+                pruning=(method == 'backtracking'))
 
-    def resolve_constraint(self, constraint):
-        """Resolve a constraint through successive localizations."""
+    def resolve_constraint(self, constraint, n_jobs=1):
+        """Resolve a constraint through successive localizations.
+
+        If ``n_jobs`` is above 1, the breach locations are first grouped in
+        clusters which cannot interact with one another, and the different
+        clusters are solved in parallel by a pool of ``n_jobs`` processes.
+        """
         evaluation = constraint.evaluate(self)
         if evaluation.passes:
             return
 
         locations = sorted(evaluation.locations)
+        if n_jobs > 1:
+            clusters = self.independent_locations_clusters(constraint,
+                                                           locations)
+            if len(clusters) > 1:
+                self.resolve_locations_clusters_in_parallel(
+                    constraint, clusters, n_jobs=n_jobs)
+                return
+        for _ in range(self.max_resolution_passes):
+            self.resolve_constraint_at_locations(constraint, locations)
+            # Overlapping breaches are solved without their righthand part,
+            # which is left to the next location. Mutations at the end of a
+            # cluster can therefore create new breaches, solved in a new pass.
+            evaluation = constraint.evaluate(self)
+            if evaluation.passes:
+                return
+            new_locations = sorted(evaluation.locations)
+            if new_locations == locations:
+                return
+            locations = new_locations
+
+    def resolve_constraint_at_locations(self, constraint, locations):
+        """Resolve a constraint's breaches at the given (sorted) locations."""
         iterator = self.logger.iter_bar(location=locations,
                                         bar_message=lambda loc: str(loc))
         for i, location in enumerate(iterator):
@@ -323,21 +614,22 @@ class DnaOptimizationProblem:
                     this_local_constraint = constraint.localized(
                         new_location, problem=self)
 
-                if this_local_constraint.evaluate(self).passes:
+                if self.evaluation_cache.passes(this_local_constraint, self):
                     continue
                 localized_constraints = [
                     _constraint.localized(new_location, problem=self)
-                    for _constraint in self.constraints
+                    for _constraint in self.specifications_overlapping(
+                        new_location)
                     if _constraint != constraint
                     if not _constraint.enforced_by_nucleotide_restrictions
                 ]
                 passing_localized_constraints = [
                     _constraint
                     for _constraint in localized_constraints
-                    if _constraint.evaluate(self).passes
+                    if self.evaluation_cache.passes(_constraint, self)
                 ]
-                local_problem = self.__class__(
-                    sequence=self.sequence,
+                local_problem = LocalProblem(
+                    parent=self,
                     constraints=([this_local_constraint] +
                                  passing_localized_constraints),
                     mutation_space=mutation_space
@@ -345,19 +637,15 @@ class DnaOptimizationProblem:
                 self.logger.store(problem=self,
                                   local_problem=local_problem,
                                   location=location)
-                local_problem.randomization_threshold = \
-                    self.randomization_threshold
-                local_problem.max_random_iters = self.max_random_iters
-                local_problem.n_mutations = self.n_mutations
                 try:
                     if hasattr(constraint, 'resolution_heuristic'):
 
                         constraint.resolution_heuristic(local_problem)
                     else:
                         local_problem.resolve_constraints_locally()
-                    self.sequence = local_problem.sequence
                     break
                 except NoSolutionError as error:
+                    local_problem.restore_window()
                     if extension == self.local_extensions[-1]:
                         error.location = new_location
                         error.constraint = constraint
@@ -370,14 +658,117 @@ class DnaOptimizationProblem:
                     else:
                         continue
 
-    def resolve_constraints(self, final_check=True):
-        """Solve a particular constraint using local, targeted searches.
+    def independent_locations_clusters(self, constraint, locations):
+        """Group breach locations into clusters which cannot interact.
+
+        The mutations made to solve a breach are restricted to the breach
+        location (extended by ``max(local_extensions)``), and can only affect
+        the evaluation of the localized constraints around it (e.g. the
+        location extended by the pattern size, GC window, hairpin window,
+        k-mer length...). Two clusters are independent when these "reach"
+        regions do not overlap.
+
+        Returns a list of clusters ``(locations, (start, end))`` where
+        ``(start, end)`` covers all the mutations of the cluster. Returns a
+        single cluster if some constraint has no localized location.
+        """
+        from .builtin_specifications.VoidSpecification import \
+            VoidSpecification
+        sequence_length = len(self.sequence_state)
+        extension = max(self.local_extensions)
+        single_cluster = [(locations, (0, sequence_length))]
+        reaches = []
+        for location in locations:
+            if not isinstance(location, Location):
+                return single_cluster
+            mutable = location.extended(extension,
+                                        upper_limit=sequence_length)
+            start, end = mutable.start, mutable.end
+            constraints = [
+                _constraint
+                for _constraint in self.specifications_overlapping(mutable)
+                if (_constraint is constraint) or
+                not _constraint.enforced_by_nucleotide_restrictions
+            ]
+            for _constraint in constraints:
+                localized = _constraint.localized(mutable, problem=self)
+                if isinstance(localized, VoidSpecification):
+                    continue
+                reach = localized.__dict__.get('location', None)
+                if reach is None:
+                    return single_cluster
+                start, end = min(start, reach.start), max(end, reach.end)
+            reaches.append((start, end, mutable, location))
+
+        clusters = []
+        for start, end, mutable, location in sorted(reaches,
+                                                   key=lambda r: r[0]):
+            if len(clusters) and (start < clusters[-1]['reach_end']):
+                cluster = clusters[-1]
+                cluster['locations'].append(location)
+                cluster['reach_end'] = max(cluster['reach_end'], end)
+                cluster['start'] = min(cluster['start'], mutable.start)
+                cluster['end'] = max(cluster['end'], mutable.end)
+            else:
+                clusters.append(dict(locations=[location], reach_end=end,
+                                     start=mutable.start, end=mutable.end))
+        return [
+            (sorted(cluster['locations']), (cluster['start'], cluster['end']))
+            for cluster in clusters
+        ]
+
+    def resolve_locations_clusters_in_parallel(self, constraint, clusters,
+                                               n_jobs):
+        """Solve independent clusters of breaches in a pool of processes.
+
+        Each process works on its own copy of the problem, and returns the
+        new subsequence in the segment of each cluster it has solved. These
+        subsequences are then merged into the problem's sequence.
+        See ``independent_locations_clusters`` for the clusters format.
+        """
+        worker_problem = copy.copy(self)
+        worker_problem.logger = MuteProgressBarLogger()
+        worker_problem.sequence_state = SequenceState(self.sequence)
+        constraint_index = self.constraints.index(constraint)
+        seeds = np.random.randint(0, 2**31, len(clusters))
+        tasks = [
+            (constraint_index, locations, segment, seed)
+            for (locations, segment), seed in zip(clusters, seeds)
+        ]
+        pool = multiprocessing.Pool(n_jobs, initializer=_initialize_worker,
+                                    initargs=(worker_problem,))
+        self.logger(location__total=len(tasks))
+        try:
+            results = list(self.logger.iter_bar(
+                location=pool.imap(_resolve_cluster_in_worker, tasks)))
+        finally:
+            pool.close()
+            pool.join()
+        self.sequence_state.apply_mutations([
+            (segment, subsequence)
+            for (_, segment), (subsequence, _, _) in zip(clusters, results)
+            if subsequence is not None
+        ])
+        self.sequence_state.commit()
+        for subsequence, message, location in results:
+            if message is not None:
+                raise NoSolutionError(
+                    message=message, problem=self, constraint=constraint,
+                    location=None if location is None else Location(*location))
+
+    def resolve_constraints(self, final_check=True, n_jobs=1):
+        """Solve all constraints using local, targeted searches.
 
         Parameters
         ----------
 
-        constraint
-          The ``Specification`` object for which the sequence should be solved
+        final_check
+          If True, all constraints are checked once all have been solved,
+          and a NoSolutionError is raised if some constraint still fails.
+
+        n_jobs
+          Number of processes used to solve independent breaches of a same
+          constraint in parallel (see ``resolve_constraint``).
 
         """
         constraints = [
@@ -390,7 +781,7 @@ class DnaOptimizationProblem:
         for constraint in self.logger.iter_bar(constraint=constraints,
                                                bar_message=lambda c: str(c)):
             try:
-                self.resolve_constraint(constraint=constraint)
+                self.resolve_constraint(constraint=constraint, n_jobs=n_jobs)
             except NoSolutionError as error:
                 self.logger(constraint__index=len(constraints))
                 raise error
@@ -410,8 +801,54 @@ class DnaOptimizationProblem:
 
     # SPECIFICATIONS
 
-    def optimize_by_exhaustive_search(self):
+    def partial_sequence_can_be_pruned(self, free_segment, score_to_beat=None):
+        """Return True if no completion of a partial sequence can be kept.
+
+        The partial sequence is the current sequence, where only the segment
+        ``free_segment=(start, end)`` can still change. It can be pruned if
+        the ``score_upper_bound`` of some constraint is negative, or if
+        ``score_to_beat`` is provided and the sum of the objectives' upper
+        bounds does not exceed it (branch-and-bound).
         """
+        for constraint in self.constraints:
+            bound = constraint.score_upper_bound(self, free_segment)
+            if (bound is not None) and (bound < 0):
+                return True
+        if score_to_beat is None:
+            return False
+        total_bound = 0
+        for objective in self.objectives:
+            bound = objective.score_upper_bound(self, free_segment)
+            if bound is None:
+                return False
+            total_bound += objective.boost * bound
+        return total_bound <= score_to_beat
+
+    def specifications_have_score_bounds(self, specifications=None):
+        """Return True if some specification implements score_upper_bound.
+
+        If none does, partial sequences can never be pruned during exhaustive
+        searches. By default, all constraints and objectives are considered.
+        """
+        if specifications is None:
+            specifications = self.constraints + self.objectives
+        return any(
+            type(specification).score_upper_bound is not
+            Specification.score_upper_bound
+            for specification in specifications
+        )
+
+    def optimize_by_exhaustive_search(self):
+        """Optimize the objectives by exploring the whole search space.
+
+        The space is explored depth-first, and partial sequences which cannot
+        lead to a sequence verifying all constraints and scoring better than
+        the current best sequence are not completed (branch-and-bound).
+
+        If no specification provides a ``score_upper_bound`` (so no pruning
+        is possible), the space is explored in Gray code order instead, where
+        only one mutation choice changes between consecutive variants, and
+        the objectives are re-evaluated incrementally.
         """
         if not self.all_constraints_pass():
             summary = self.constraints_text_summary(failed_only=True)
@@ -430,11 +867,21 @@ class DnaOptimizationProblem:
 
         current_best_score = self.objective_scores_sum()
         current_best_sequence = self.sequence
-        all_variants = self.mutation_space.all_variants(self.sequence)
+
+        if not self.specifications_have_score_bounds():
+            self.optimize_by_gray_code_search(current_best_score,
+                                              best_possible_score)
+            return
+
+        def prune(free_segment):
+            return self.partial_sequence_can_be_pruned(
+                free_segment, score_to_beat=current_best_score)
+
+        all_variants = self.mutation_space.all_variants_with_pruning(
+            self.sequence_state, prune=prune)
         space_size = int(self.mutation_space.space_size)
         self.logger(mutation__total=space_size)
         for variant in self.logger.iter_bar(mutation=all_variants):
-            self.sequence = variant
             if self.all_constraints_pass():
                 score = self.objective_scores_sum()
                 if score > current_best_score:
@@ -444,19 +891,59 @@ class DnaOptimizationProblem:
                             (current_best_score >= best_possible_score)):
                         self.logger(mutation__index=space_size)
                         break
-            self.sequence = self.sequence_before
         self.sequence = current_best_sequence
         assert self.all_constraints_pass()
 
-    def optimize_by_random_mutations(self):
+    def optimize_by_gray_code_search(self, current_best_score,
+                                     best_possible_score=None):
+        """Optimize the objectives by a Gray code enumeration of all variants.
+
+        This is used by ``optimize_by_exhaustive_search``. Each variant only
+        differs from the previous one by one mutation choice, so the
+        objectives are re-evaluated with ``evaluate_delta`` on the changed
+        segment only.
         """
+        current_best_sequence = self.sequence
+        all_variants = self.mutation_space.all_variants_gray_code(
+            self.sequence_state)
+        space_size = int(self.mutation_space.space_size)
+        self.logger(mutation__total=space_size)
+        evaluations = None
+        for variant, changed_segment in self.logger.iter_bar(
+                mutation=all_variants):
+            evaluations = self.objectives_evaluations(
+                changed_segments=[changed_segment],
+                previous_evaluations=evaluations)
+            score = evaluations.scores_sum()
+            if (score > current_best_score) and self.all_constraints_pass():
+                current_best_score = score
+                current_best_sequence = self.sequence
+                if ((best_possible_score is not None) and
+                        (current_best_score >= best_possible_score)):
+                    self.logger(mutation__index=space_size)
+                    break
+        self.sequence = current_best_sequence
+        assert self.all_constraints_pass()
+
+    def optimize_by_random_mutations(self):
+        """Optimize the objectives via random mutations.
+
+        At each iteration, ``self.n_mutations`` random mutations are applied
+        to the sequence. The mutated sequence is kept if it verifies all
+        constraints and is accepted by ``self.search_strategy`` (by default,
+        a ``HillClimbing`` which only accepts score improvements). The search
+        stops after ``self.max_random_iters`` iterations, or after
+        ``self.max_random_time`` seconds if this attribute is not None. In
+        the end, the sequence is the best-scoring sequence found.
         """
 
-        if not self.all_constraints_pass():
+        constraints_evaluations = self.constraints_evaluations()
+        if not constraints_evaluations.all_evaluations_pass():
             summary = self.constraints_text_summary()
             raise ValueError(summary + "Optimization can only be done when all"
                              " constraints are verified")
-        score = self.objective_scores_sum()
+        objectives_evaluations = self.objectives_evaluations()
+        score = objectives_evaluations.scores_sum()
 
         if all([obj.best_possible_score is not None
                 for obj in self.objectives]):
@@ -465,23 +952,49 @@ class DnaOptimizationProblem:
         else:
             best_possible_score = None
         iters = self.max_random_iters
+        strategy = self.search_strategy
+        strategy.initialize(n_iterations=iters)
+        best_score, best_sequence = score, self.sequence
+        start_time = time.time()
         for iteration in self.logger.iter_bar(mutation=range(iters)):
             if ((best_possible_score is not None) and
-                    (score >= best_possible_score)):
+                    (best_score >= best_possible_score)):
+                self.logger(mutation__index=iters)
+                break
+            if ((self.max_random_time is not None) and
+                    (time.time() - start_time > self.max_random_time)):
                 self.logger(mutation__index=iters)
                 break
 
-            previous_sequence = self.sequence
-            self.sequence = self.mutation_space.apply_random_mutations(
-                n_mutations=self.n_mutations, sequence=self.sequence)
-            if self.all_constraints_pass():
-                new_score = self.objective_scores_sum()
-                if new_score > score:
+            mutations = self.mutation_space.pick_random_mutations(
+                n_mutations=self.n_mutations, sequence=self.sequence_state,
+                random_generator=self.random_generator)
+            if not strategy.allows(mutations):
+                continue
+            self.sequence_state.apply_mutations(mutations)
+            changed_segments = [segment for segment, _ in mutations]
+            new_constraints_evaluations = self.constraints_evaluations(
+                changed_segments=changed_segments,
+                previous_evaluations=constraints_evaluations)
+            if new_constraints_evaluations.all_evaluations_pass():
+                new_objectives_evaluations = self.objectives_evaluations(
+                    changed_segments=changed_segments,
+                    previous_evaluations=objectives_evaluations)
+                new_score = new_objectives_evaluations.scores_sum()
+                if strategy.accepts(new_score, score, iteration):
                     score = new_score
+                    constraints_evaluations = new_constraints_evaluations
+                    objectives_evaluations = new_objectives_evaluations
+                    self.sequence_state.commit()
+                    strategy.record(mutations)
+                    if score > best_score:
+                        best_score, best_sequence = score, self.sequence
                 else:
-                    self.sequence = previous_sequence
+                    self.sequence_state.revert()
             else:
-                self.sequence = previous_sequence
+                self.sequence_state.revert()
+        if best_score > score:
+            self.sequence = best_sequence
         #  assert self.all_constraints_pass()
 
     def optimize_objective(self, objective):
@@ -507,33 +1020,33 @@ class DnaOptimizationProblem:
             location = Location(*mutation_space.choices_span)
             localized_constraints = [
                 _constraint.localized(location, problem=self)
-                for _constraint in self.constraints
+                for _constraint in self.specifications_overlapping(location)
             ]
-            local_problem = DnaOptimizationProblem(
-                sequence=self.sequence,
+            local_problem = LocalProblem(
+                parent=self,
                 constraints=localized_constraints,
                 mutation_space=mutation_space,
                 objectives=[
                     _objective.localized(location, problem=self)
-                    for _objective in self.objectives
+                    for _objective in self.specifications_overlapping(
+                        location, role="objective")
                 ]
             )
             self.logger.store(problem=self,
                               local_problem=local_problem,
                               location=location)
-            local_problem.randomization_threshold = self.randomization_threshold
-            local_problem.max_random_iters = self.max_random_iters
-            local_problem.n_mutations = self.n_mutations
             if hasattr(objective, 'optimization_heuristic'):
                 objective.optimization_heuristic(local_problem)
             else:
-                space_size = local_problem.mutation_space.space_size
-                exhaustive_search = space_size < self.randomization_threshold
+                log_space_size = local_problem.mutation_space.log_space_size
+                exhaustive_search = (log_space_size <
+                                     np.log10(self.randomization_threshold))
+                self.logger.store(search_method=(
+                    'exhaustive' if exhaustive_search else 'random'))
                 if exhaustive_search:
                     local_problem.optimize_by_exhaustive_search()
                 else:
                     local_problem.optimize_by_random_mutations()
-            self.sequence = local_problem.sequence
 
     def optimize(self):
         """Maximize the objective via local, targeted mutations."""
@@ -617,7 +1130,8 @@ class DnaOptimizationProblem:
             return record
 
     def sequence_edits_as_array(self):
-        return sequences_differences_array(self.sequence, self.sequence_before)
+        return sequences_differences_array(self.sequence_array,
+                                           self.sequence_before)
 
 
     def sequence_edits_as_features(self, feature_type="misc_feature"):
@@ -630,3 +1144,97 @@ class DnaOptimizationProblem:
                 is_edit="true")
             for start, end in segments
         ]
+
+
+class LocalProblem(DnaOptimizationProblem):
+    """Lightweight view of a problem restricted to a local mutation space.
+
+    The local problems created by ``resolve_constraint`` and
+    ``optimize_objective`` share the sequence state (mutations are applied
+    directly on the parent problem's sequence), the logger and the solver
+    settings of their parent problem. They only hold their own localized
+    specifications and mutation space. Contrary to a new
+    ``DnaOptimizationProblem``, no initialization of the specifications or
+    of the mutation space is performed.
+
+    Parameters
+    ----------
+
+    parent
+      The DnaOptimizationProblem from which the local problem is derived.
+
+    constraints
+      List of localized constraints (already initialized).
+
+    mutation_space
+      The localized MutationSpace.
+
+    objectives
+      List of localized objectives (already initialized).
+    """
+
+    shared_settings = ('randomization_threshold', 'dispatch_samples',
+                       'max_resolution_passes',
+                       'max_random_iters', 'n_mutations', 'random_batch_size',
+                       'search_strategy', 'max_random_time',
+                       'local_extensions', 'constraints_stats',
+                       'evaluation_cache', 'random_generator')
+
+    def __init__(self, parent, constraints, mutation_space, objectives=None):
+        """Initialize."""
+        self.parent = parent
+        self.record = None
+        self.sequence_state = parent.sequence_state
+        self.logger = parent.logger
+        self.constraints = constraints
+        self.objectives = [] if objectives is None else objectives
+        self.mutation_space = mutation_space
+        for setting in self.shared_settings:
+            setattr(self, setting, getattr(parent, setting))
+        self._constraints_before = None
+        self._objectives_before = None
+        self.window = mutation_space.choices_span
+        if self.window is None:
+            self.window = (mutation_space.offset, mutation_space.offset)
+        start, end = self.window
+        self.window_before = self.sequence_state[start: end]
+
+    @property
+    def sequence_before(self):
+        """Return the parent problem's initial sequence."""
+        return self.parent.sequence_before
+
+    def restore_window(self):
+        """Revert all the mutations made in the local problem's window."""
+        self.sequence_state.apply_mutations([(self.window,
+                                              self.window_before)])
+        self.sequence_state.commit()
+
+
+# PARALLEL SOLVING: these functions are run by the worker processes of
+# DnaOptimizationProblem.resolve_locations_clusters_in_parallel
+
+_worker_problem = None
+
+
+def _initialize_worker(problem):
+    """Store the worker process's copy of the problem."""
+    global _worker_problem
+    _worker_problem = problem
+
+
+def _resolve_cluster_in_worker(task):
+    """Solve a cluster of breaches, return the (subsequence, error, location).
+    """
+    constraint_index, locations, (start, end), seed = task
+    np.random.seed(seed)
+    problem = _worker_problem
+    problem.random_generator = np.random.default_rng(seed)
+    constraint = problem.constraints[constraint_index]
+    try:
+        problem.resolve_constraint_at_locations(constraint, locations)
+    except NoSolutionError as error:
+        location = error.location
+        location = None if location is None else location.to_tuple()
+        return None, error.message, location
+    return problem.sequence_state[start: end], None, None
@@ -0,0 +1,135 @@
+"""Define the EvaluationCache class.
+
+During constraints resolution, the same localized specifications are often
+re-evaluated on subsequences which have been seen before (when the solver
+tries different local extensions, or when random mutations revert to an
+earlier variant). The EvaluationCache remembers the most recent evaluations
+so that these are not recomputed.
+"""
+
+from collections import OrderedDict
+
+
+class EvaluationCache:
+    """LRU cache of the evaluations of specifications on subsequences.
+
+    Evaluations are keyed by the identity of the specification (more
+    precisely its ``cache_root``, shared by all its localized copies), its
+    location, and the subsequence at this location. Only specifications
+    whose evaluation depends solely on that subsequence (those with
+    ``cacheable=True``) are cached.
+
+    Examples
+    --------
+
+    >>> cache = EvaluationCache(max_size=1000)
+    >>> evaluation = cache.evaluate(specification, problem)
+    >>> print (cache.hits, cache.misses)
+
+    Parameters
+    ----------
+
+    max_size
+      Maximal number of evaluations stored. When it is reached, the least
+      recently used evaluations are forgotten.
+
+    max_location_size
+      Specifications with a location larger than this are not cached (their
+      evaluations rarely repeat and can use a lot of memory).
+
+    Attributes
+    ----------
+
+    hits
+      Number of evaluations which were found in the cache.
+
+    misses
+      Number of evaluations which had to be computed.
+    """
+
+    def __init__(self, max_size=2000, max_location_size=2000):
+        """Initialize."""
+        self.max_size = max_size
+        self.max_location_size = max_location_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, specification, problem):
+        """Return the cache key for the specification, or None."""
+        location = getattr(specification, 'location', None)
+        if ((not specification.cacheable) or (self.max_size == 0) or
+                (location is None) or
+                (len(location) > self.max_location_size)):
+            return None
+        subsequence = problem.sequence_array[location.start: location.end]
+        return (id(specification.cache_root), location.to_tuple(),
+                subsequence.tobytes())
+
+    def get(self, key):
+        """Return the cached (root, evaluation, passes) for the key, or None."""
+        if key not in self.entries:
+            return None
+        value = self.entries.pop(key)
+        self.entries[key] = value
+        return value
+
+    def store(self, key, specification, evaluation=None, passes=None):
+        """Store an evaluation or a passes/fails result under the key."""
+        if key in self.entries:
+            _, previous_evaluation, previous_passes = self.entries.pop(key)
+            if evaluation is None:
+                evaluation = previous_evaluation
+        elif len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+        if evaluation is not None:
+            passes = evaluation.passes
+        # The root is stored so that its id does not get re-used.
+        self.entries[key] = (specification.cache_root, evaluation, passes)
+
+    def evaluate(self, specification, problem):
+        """Return ``specification.evaluate(problem)``, cached."""
+        key = self.key(specification, problem)
+        if key is None:
+            return specification.evaluate(problem)
+        cached = self.get(key)
+        if (cached is not None) and (cached[1] is not None):
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        evaluation = specification.evaluate(problem)
+        self.store(key, specification, evaluation=evaluation)
+        return evaluation
+
+    def passes(self, specification, problem):
+        """Return ``specification.passes(problem)``, cached."""
+        key = self.key(specification, problem)
+        if key is None:
+            return specification.passes(problem)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        passes = specification.passes(problem)
+        self.store(key, specification, passes=passes)
+        return passes
+
+    def clear(self):
+        """Empty the cache and reset the hits and misses counters."""
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        """Return the number of entries in the cache."""
+        return len(self.entries)
+
+    def __getstate__(self):
+        """Do not copy the cached entries when the cache is pickled."""
+        state = dict(self.__dict__)
+        state['entries'] = OrderedDict()
+        return state
+
+    def __repr__(self):
+        return "EvaluationCache(%d entries, %d hits, %d misses)" % (
+            len(self), self.hits, self.misses)
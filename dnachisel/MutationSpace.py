@@ -1,8 +1,10 @@
 """Define MutationSpace"""
 
+import array
 import itertools
 import numpy as np
-from .biotools import windows_overlap
+from .biotools import windows_overlap, sequence_to_array
+from .SequenceState import SequenceState
 
 class MutationChoice:
     """Represent a segment of a sequence with several possible variants.
@@ -59,34 +61,87 @@ class MutationChoice:
 
         """
         others = sorted(others, key=lambda o: o.start)
-        others_start = others[0].start
-        final_segment = others_start, others[-1].end
+        final_segment = others[0].start, others[-1].end
+        # The candidates are percolated through the others from left to
+        # right, as in a trie: the partial sequences are grouped by the
+        # prefix of the candidates they are compatible with, so candidates
+        # sharing a prefix share the partial sequences, and a prefix with no
+        # compatible variant in an other is dropped with all its candidates.
+        prefixes = {"": ([""], list(self.variants))}
+        covered_end = self.start
+        for other in others:
+            overlap = windows_overlap(other.segment, self.segment)
+            if (overlap is None) or (overlap[0] != covered_end):
+                # Part of the candidates is not covered by the others.
+                prefixes = {}
+                break
+            istart, iend = overlap
+            variants_by_overlap = {}
+            for variant in other.variants:
+                subseq = variant[istart - other.start: iend - other.start]
+                variants_by_overlap.setdefault(subseq, []).append(variant)
+            new_prefixes = {}
+            for prefix, (partial_sequences, candidates) in prefixes.items():
+                candidates_by_chunk = {}
+                for candidate in candidates:
+                    chunk = candidate[istart - self.start: iend - self.start]
+                    candidates_by_chunk.setdefault(chunk, []).append(
+                        candidate)
+                for chunk, chunk_candidates in candidates_by_chunk.items():
+                    variants = variants_by_overlap.get(chunk, None)
+                    if variants is None:
+                        continue
+                    new_prefixes[prefix + chunk] = (
+                        [
+                            partial_sequence + variant
+                            for partial_sequence in partial_sequences
+                            for variant in variants
+                        ],
+                        chunk_candidates
+                    )
+            prefixes = new_prefixes
+            covered_end = iend
+            if prefixes == {}:
+                break
         final_variants = set()
-        for candidate in self.variants:
-            slots = []
-            for other in others:
-                istart, iend = windows_overlap(other.segment, self.segment)
-                slot = []
-                for variant in other.variants:
-                    subseq = variant[istart - other.start: iend - other.start]
-                    subcandidate = candidate[istart - self.start:
-                                             iend - self.start]
-                    if subseq == subcandidate:
-                        slot.append(variant)
-                slots.append(slot)
-            for subseqs in itertools.product(*slots):
-                seq = "".join(subseqs)
-                matching_seq = seq[self.start - others_start:
-                                   self.end - others_start]
-                if matching_seq == candidate:
-                    final_variants.add(seq)
+        if covered_end == self.end:
+            for partial_sequences, candidates in prefixes.values():
+                final_variants.update(partial_sequences)
         return MutationChoice(segment=final_segment,
                               variants=final_variants)
 
+    def split_independent_segments(self):
+        """Split the choice into choices on independent sub-segments.
+
+        The choice is cut at every position where the variants are exactly
+        all the combinations of a variant prefix and a variant suffix, so
+        the sub-segments can be mutated independently.
+
+        >>> choice = MutationChoice((0, 5), ['ATTTC', 'TGTTC', 'ATTTA',
+        >>>                                  'TGTTA'])
+        >>> choice.split_independent_segments()
+        >>> # => [MutChoice(0-2 AT-TG), MutChoice(2-5 TTC-TTA)]
+        """
+        if len(self.variants) <= 1:
+            return [self]
+        variants = list(self.variants)
+        for cut in range(1, self.end - self.start):
+            prefixes = set([v[:cut] for v in variants])
+            suffixes = set([v[cut:] for v in variants])
+            # The variants are a subset of all the (prefix, suffix) pairs.
+            if len(prefixes) * len(suffixes) == len(variants):
+                suffix_choice = MutationChoice(
+                    (self.start + cut, self.end), suffixes)
+                return ([MutationChoice((self.start, self.start + cut),
+                                        prefixes)] +
+                        suffix_choice.split_independent_segments())
+        return [self]
+
     def extract_varying_region(self):
-        """Return MutationChoices for the central varying region and 2 flanks.
+        """Return MutationChoices for the varying region and 2 flanks.
 
-        For instance:
+        The varying region is further split into independent segments (see
+        ``split_independent_segments``). For instance:
 
         >>> choice = MutationChoice((5, 12), [
         >>>     'ATGCGTG',
@@ -108,11 +163,11 @@ class MutationChoice:
             return [self]
         variants = list(self.variants)
         variants_array = np.array([
-            np.fromstring(v, dtype='uint8')
+            sequence_to_array(v)
             for v in self.variants
         ])
-        variance_array = np.diff(variants_array, axis=0).max(axis=0)
-        varying_indices = variance_array.nonzero()[0]
+        varying = (variants_array != variants_array[0]).any(axis=0)
+        varying_indices = varying.nonzero()[0]
         result = []
         start = varying_indices.min()
         end = varying_indices.max() + 1
@@ -120,8 +175,10 @@ class MutationChoice:
         if start > 0:
             result.append(MutationChoice((self.start, self.start + start),
                                          set([variants[0][:start]])))
-        result.append(MutationChoice((self.start + start, self.start + end),
-                                     set([v[start: end] for v in variants])))
+        varying_region = MutationChoice(
+            (self.start + start, self.start + end),
+            set([v[start: end] for v in variants]))
+        result += varying_region.split_independent_segments()
         if end < len(variants[0]):
             result.append(MutationChoice((self.start + end, self.end),
                                          set([v[end:] for v in variants])))
@@ -138,9 +195,187 @@ class MutationChoice:
         return "MutChoice(%d-%d %s)" % (self.start, self.end, subsequences)
 
 
+NO_CHOICE = -1
+DEFAULT_CHOICE = -2
+# The use of different nucleotide orders by arrays of 4 "randomizes" the
+# considered sequence variants, thus reducing the apparition of homopolymers
+# during exhaustive searches (may create 4bp tandem repeats though). also
+# increased solving time by 6% in tests.
+DEFAULT_VARIANTS = ["ACTG", "CTGA", "TGAC", "GACT"]
+
+
+class MutationChoicesTable:
+    """Compact table of the explicit MutationChoices of mutation spaces.
+
+    Each choice is stored as a (start, end, variants_id) entry, and identical
+    sets of variants are only stored once. The table is append-only, so it
+    can be shared between a mutation space, its localized versions, and the
+    mutation spaces derived from it.
+
+    Mutation choices objects are only created when requested (except for
+    choices added with ``keep_object=True``, which are kept as-is).
+    """
+
+    def __init__(self):
+        """Initialize."""
+        self.starts = array.array('i')
+        self.ends = array.array('i')
+        self.variants_ids = array.array('i')
+        self.variants = []
+        self.variants_indices = {}
+        self.variants_arrays = {}
+        self.objects = {}
+
+    def add(self, choice, keep_object=False):
+        """Add a MutationChoice to the table and return its id."""
+        key = tuple(choice.variants)
+        if key not in self.variants_indices:
+            self.variants_indices[key] = len(self.variants)
+            self.variants.append(choice.variants)
+        choice_id = len(self.starts)
+        self.starts.append(choice.start)
+        self.ends.append(choice.end)
+        self.variants_ids.append(self.variants_indices[key])
+        if keep_object:
+            self.objects[choice_id] = choice
+        return choice_id
+
+    def choice(self, choice_id):
+        """Return the MutationChoice with the given id."""
+        if choice_id in self.objects:
+            return self.objects[choice_id]
+        return MutationChoice(
+            (self.starts[choice_id], self.ends[choice_id]),
+            variants=self.variants[self.variants_ids[choice_id]])
+
+    def variants_array(self, variants_id):
+        """Return a uint8 array with one encoded variant per row.
+
+        Returns None if the variants do not all have the same length.
+        """
+        if variants_id not in self.variants_arrays:
+            variants = list(self.variants[variants_id])
+            lengths = set(len(v) for v in variants)
+            if len(lengths) != 1:
+                array_ = None
+            else:
+                array_ = np.frombuffer("".join(variants).encode(),
+                                       dtype='uint8')
+                array_ = array_.reshape((len(variants), lengths.pop()))
+            self.variants_arrays[variants_id] = array_
+        return self.variants_arrays[variants_id]
+
+    def __len__(self):
+        """Return the number of choices in the table."""
+        return len(self.starts)
+
+
+class MutationSampler:
+    """Draw random mutations from a list of MutationChoices, by blocks.
+
+    The variants of each choice are converted once into lists (with an index
+    of each variant's position). Random proposals (which choices to mutate,
+    and a random number for the variant of each choice) are then drawn by
+    blocks with a numpy random Generator. The block size starts small and
+    doubles at each new block, up to ``max_block_size``, so that short
+    searches do not draw a large block of proposals.
+
+    The variants are only selected when a proposal is used, so that the
+    variant drawn for a choice is always different from the current
+    subsequence at this choice, even after the sequence has been mutated.
+
+    Parameters
+    ----------
+
+    choices
+      A list of MutationChoices (with at least two variants each).
+
+    max_block_size
+      Maximal number of proposals drawn at once.
+    """
+
+    def __init__(self, choices, max_block_size=10000):
+        """Initialize."""
+        self.segments = [choice.segment for choice in choices]
+        self.variants = []
+        self.variants_indices = []
+        variants_lists = {}
+        for choice in choices:
+            key = id(choice.variants)
+            if key not in variants_lists:
+                variants = list(choice.variants)
+                indices = {v: i for i, v in enumerate(variants)}
+                variants_lists[key] = (variants, indices)
+            variants, indices = variants_lists[key]
+            self.variants.append(variants)
+            self.variants_indices.append(indices)
+        self.max_block_size = max_block_size
+        self.block_size = 50
+        self.block = []
+        self.block_n_mutations = None
+
+    def draw_block(self, n_mutations, random_generator):
+        """Draw a new block of proposals of n_mutations mutations each.
+
+        The choices of each proposal are drawn without replacement: the j-th
+        choice is drawn among the n - j choices which are not picked yet
+        (this requires O(n_mutations^2) vectorized operations per block).
+        """
+        self.block_size = min(2 * self.block_size, self.max_block_size)
+        n_choices = len(self.segments)
+        size = self.block_size
+        picks = np.zeros((size, n_mutations), dtype=int)
+        for j in range(n_mutations):
+            picked = np.random.randint(0, n_choices - j, size) \
+                if random_generator is None \
+                else random_generator.integers(0, n_choices - j, size)
+            previous_picks = np.sort(picks[:, :j], axis=1)
+            for column in range(j):
+                picked += (picked >= previous_picks[:, column])
+            picks[:, j] = picked
+        if random_generator is None:
+            uniforms = np.random.random_sample((size, n_mutations))
+        else:
+            uniforms = random_generator.random((size, n_mutations))
+        self.block = list(zip(picks.tolist(), uniforms.tolist()))
+        self.block.reverse()
+        self.block_n_mutations = n_mutations
+
+    def draw(self, n_mutations, sequence, random_generator=None):
+        """Return a list of n_mutations [(segment, variant)] mutations.
+
+        ``sequence`` can be a string or a SequenceState.
+        """
+        n_mutations = min(len(self.segments), n_mutations)
+        if (self.block == []) or (n_mutations != self.block_n_mutations):
+            self.draw_block(n_mutations, random_generator)
+        picks, uniforms = self.block.pop()
+        mutations = []
+        for index, uniform in zip(picks, uniforms):
+            segment = self.segments[index]
+            variants = self.variants[index]
+            current = self.variants_indices[index].get(
+                sequence[segment[0]: segment[1]], None)
+            if current is None:
+                variant_index = int(uniform * len(variants))
+            else:
+                variant_index = int(uniform * (len(variants) - 1))
+                if variant_index >= current:
+                    variant_index += 1
+            mutations.append((segment, variants[variant_index]))
+        return mutations
+
+
 class MutationSpace:
     """Class for mutation space (set of sequence segments and their variants).
 
+    The mutation space is stored compactly as an array of choice ids (one
+    per nucleotide) referring to a ``MutationChoicesTable``. Nucleotides
+    which can be mutated to any other nucleotide use an implicit default
+    choice, with no per-nucleotide object. The ``choices_index``,
+    ``choices_list``, ``multichoices``, etc. are computed when first
+    accessed.
+
     Parameters
     ----------
 
@@ -148,6 +383,21 @@ class MutationSpace:
       A list L such that L[i] gives the MutationChoice governing the mutations
       allowed at position i (ansd possibly around i)
 
+    offset
+      Position in the sequence of the first element of ``choices_index``.
+      This enables localized mutation spaces to only store the choices of
+      their window. The ``choices_index`` attribute always gives the list
+      indexed from position 0 (it is computed on demand when offset > 0).
+
+    choice_ids
+      Array of choice ids which can be provided instead of ``choices_index``
+      (together with ``choices_table``). Ids are either ``NO_CHOICE``
+      (position not mutable), ``DEFAULT_CHOICE`` (any nucleotide), or the
+      index of a choice in the ``choices_table``.
+
+    choices_table
+      A MutationChoicesTable, to be provided with ``choice_ids``.
+
 
     Examples
     --------
@@ -161,40 +411,229 @@ class MutationSpace:
             MutationChoice((2, 5), {'TTC', 'TTA', 'TTT'}),
         ])
     """
-    def __init__(self, choices_index):
+    def __init__(self, choices_index=None, offset=0, choice_ids=None,
+                 choices_table=None):
         """
 
         choices_index = [MutationChoice(0-2), MutationChoice(0-2),
                          MutationChoice(3-5), MutationChoice(3-5),
                          MutationChoice(3-5), ... ]
         """
-        self.choices_index = choices_index
-        self.choices_list = []
-        if choices_index[0] is not None:
-            self.choices_list.append(choices_index[0])
-        for c in choices_index[1:]:
-            if c is None:
-                continue
-            if len(self.choices_list) == 0:
-                self.choices_list = [c]
-            elif c != self.choices_list[-1]:
-                self.choices_list.append(c)
+        if choice_ids is None:
+            choices_table = MutationChoicesTable()
+            choice_ids = np.full(len(choices_index), NO_CHOICE, dtype='int32')
+            table_ids = {}
+            for i, choice in enumerate(choices_index):
+                if choice is None:
+                    continue
+                if id(choice) not in table_ids:
+                    table_ids[id(choice)] = choices_table.add(
+                        choice, keep_object=True)
+                choice_ids[i] = table_ids[id(choice)]
+        self.offset = offset
+        self.choice_ids = choice_ids
+        self.choices_table = choices_table
+        self._choices_list = None
+        self._multichoices = None
+        self._sampler = None
+
+    @property
+    def choice_ids(self):
+        """Return the array of the choice ids of the window's positions.
+
+        For spaces created with ``with_added_restrictions``, the array is only
+        built (from the parent space's array and the restricted segments)
+        when it is first requested.
+        """
+        if self._patches is not None:
+            self._base_ids = self._window_ids(self.offset,
+                                              self.offset + self._length)
+            self._base_offset = self.offset
+            self._patches = None
+        return self._base_ids
+
+    @choice_ids.setter
+    def choice_ids(self, choice_ids):
+        self._base_ids = choice_ids
+        self._base_offset = self.offset
+        self._length = len(choice_ids)
+        self._patches = None
+
+    def _window_ids(self, start, end):
+        """Return the array of choice ids for positions start-end.
+
+        The segment must be in the space's window. For spaces created with
+        ``with_added_restrictions`` only the requested segment is computed,
+        from the parent's array and the restricted segments ("patches").
+        """
+        base_start = self._base_offset
+        if self._patches is None:
+            return self._base_ids[start - base_start: end - base_start]
+        ids = np.full(end - start, NO_CHOICE, dtype='int32')
+        patches = [(base_start, self._base_ids)] + self._patches
+        for patch_start, patch_ids in patches:
+            overlap_start = max(start, patch_start)
+            overlap_end = min(end, patch_start + len(patch_ids))
+            if overlap_start < overlap_end:
+                ids[overlap_start - start: overlap_end - start] = \
+                    patch_ids[overlap_start - patch_start:
+                              overlap_end - patch_start]
+        return ids
+
+    def with_added_restrictions(self, choices):
+        """Return a new space where the choices restrict the mutations further.
+
+        ``choices`` is a list of MutationChoices or ``(segment, variants)``
+        couples, as returned by ``Specification.restrict_nucleotides``. Each
+        restriction is percolated with the choices it overlaps in the space
+        (the window is extended if it doesn't cover the restrictions).
+
+        The new space shares the choices table and the choice ids array of
+        this space (which is not modified), and only stores the ids of the
+        restricted segments, so it is created in a time proportional to the
+        size of the restrictions. This makes it cheap to probe many
+        alternative restrictions (for instance where to insert a pattern).
+        """
+        space = MutationSpace(choice_ids=self._base_ids,
+                              choices_table=self.choices_table,
+                              offset=self._base_offset)
+        space.offset = self.offset
+        space._length = self._length
+        space._patches = list(self._patches or [])
+        choices = sorted([
+            choice
+            if isinstance(choice, MutationChoice)
+            else MutationChoice(segment=choice[0], variants=set(choice[1]))
+            for choice in choices
+        ], key=lambda choice: (choice.end - choice.start, choice.start))
+        for choice in choices:
+            underlying_choices = space.choices_in(choice.start, choice.end)
+            if underlying_choices == []:
+                new_choice = choice
+            else:
+                new_choice = choice.percolate_with(underlying_choices)
+            for choice in new_choice.extract_varying_region():
+                choice_id = self.choices_table.add(choice)
+                space._patches.append((choice.start, np.full(
+                    choice.end - choice.start, choice_id, dtype='int32')))
+                window_end = max(space.offset + space._length, choice.end)
+                space.offset = min(space.offset, choice.start)
+                space._length = window_end - space.offset
+        return space
+
+    def _choices_runs(self, start=None, end=None, explicit_only=False):
+        """Return the (choice_id, position) of each choice in the segment.
+
+        Each default choice covers a single nucleotide, other choices can
+        cover several consecutive nucleotides (the position returned is then
+        the first position of the choice in the segment).
+        """
+        start = self.offset if start is None else max(start, self.offset)
+        window_end = self.offset + self._length
+        end = window_end if end is None else min(end, window_end)
+        if start >= end:
+            return []
+        ids = self._window_ids(start, end)
+        if len(ids) == 0:
+            return []
+        if len(ids) < 32:
+            # Numpy has too much overhead on the small segments which are
+            # queried when building the mutation space.
+            runs, previous_id = [], NO_CHOICE
+            for i, choice_id in enumerate(ids.tolist()):
+                if (choice_id != previous_id) or (choice_id == DEFAULT_CHOICE):
+                    if (choice_id >= 0) or ((choice_id == DEFAULT_CHOICE) and
+                                            not explicit_only):
+                        runs.append((choice_id, start + i))
+                previous_id = choice_id
+            return runs
+        is_run_start = np.ones(len(ids), dtype=bool)
+        is_run_start[1:] = (ids[1:] != ids[:-1]) | (ids[1:] == DEFAULT_CHOICE)
+        runs_starts = np.flatnonzero(is_run_start)
+        runs_ids = ids[runs_starts]
+        selected = (runs_ids >= 0) if explicit_only else (runs_ids != NO_CHOICE)
+        return zip(runs_ids[selected].tolist(),
+                   (runs_starts[selected] + start).tolist())
+
+    def _choice(self, choice_id, position):
+        """Return the MutationChoice with this id at this position."""
+        if choice_id == DEFAULT_CHOICE:
+            return MutationChoice((position, position + 1),
+                                  variants=DEFAULT_VARIANTS[position % 4])
+        return self.choices_table.choice(choice_id)
+
+    def choices_in(self, start, end):
+        """Return the list of MutationChoices overlapping the segment."""
+        return [
+            self._choice(choice_id, position)
+            for (choice_id, position) in self._choices_runs(start, end)
+        ]
+
+    def _explicit_choices(self):
+        """Return the list of non-default MutationChoices of the space."""
+        return [
+            self.choices_table.choice(choice_id)
+            for (choice_id, position)
+            in self._choices_runs(explicit_only=True)
+        ]
 
-        self.unsolvable_segments = [
+    @property
+    def choices_list(self):
+        """Return the list of the (different) MutationChoices of the space."""
+        if self._choices_list is None:
+            self._choices_list = self.choices_in(None, None)
+        return self._choices_list
+
+    @property
+    def multichoices(self):
+        """Return the MutationChoices with more than one variant."""
+        if self._multichoices is None:
+            self._multichoices = [
+                choice
+                for choice in self.choices_list
+                if len(choice.variants) > 1
+            ]
+        return self._multichoices
+
+    @property
+    def unsolvable_segments(self):
+        """Return the segments of the choices with no variants."""
+        return [
             choice.segment
-            for choice in self.choices_list
+            for choice in self._explicit_choices()
             if len(choice.variants) == 0
         ]
-        self.determined_segments = [
+
+    @property
+    def determined_segments(self):
+        """Return the [(segment, variant)] of choices with a single variant.
+        """
+        return [
             (choice.segment, list(choice.variants)[0])
-            for choice in self.choices_list
+            for choice in self._explicit_choices()
             if len(choice.variants) == 1
         ]
-        self.multichoices = [
-            choice
-            for choice in self.choices_list
-            if len(choice.variants) > 1
-        ]
+
+    @property
+    def choices_window(self):
+        """Return the list of the MutationChoice at each window position."""
+        window = self._length * [None]
+        for choice in self.choices_list:
+            start = max(choice.start, self.offset) - self.offset
+            end = min(choice.end - self.offset, len(window))
+            window[start:end] = (end - start) * [choice]
+        return window
+
+    @property
+    def choices_index(self):
+        """Return the list of the MutationChoice at each sequence position."""
+        return self.offset * [None] + self.choices_window
+
+    @property
+    def window(self):
+        """Return (start, end), the segment covered by the space's choice ids.
+        """
+        return self.offset, self.offset + self._length
 
     @property
     def choices_span(self):
@@ -210,7 +649,7 @@ class MutationSpace:
         mutation space are replaced by nucleotides compatible with the space.
         """
         new_sequence = bytearray(sequence.encode())
-        for choice in self.choices_list:
+        for choice in self._explicit_choices():
             variants = choice.variants
             if len(choice.variants) == 0:
                 raise ValueError("Cannot constrain a sequence when some "
@@ -230,47 +669,79 @@ class MutationSpace:
             start, end = location.start, location.end
         else:
             start, end = location
-        return MutationSpace(start * [None] + self.choices_index[start:end])
+        start = max(start, self.offset)
+        end = max(start, min(end, self.offset + self._length))
+        choice_ids = self._window_ids(start, end)
+        return MutationSpace(choice_ids=choice_ids,
+                             choices_table=self.choices_table, offset=start)
 
     @property
-    def space_size(self):
-        """Return the number of possible mutations"""
+    def log_space_size(self):
+        """Return the base-10 logarithm of the number of possible variants.
+
+        Unlike ``space_size``, this never overflows on large spaces. Returns
+        ``-inf`` if no choice of the space has several variants.
+        """
         if len(self.multichoices) == 0:
+            return -np.inf
+        return float(np.log10([
+            len(choice.variants)
+            for choice in self.multichoices
+        ]).sum())
+
+    @property
+    def space_size(self):
+        """Return the number of possible mutations.
+
+        Returns ``inf`` for spaces too large to be counted with a float (use
+        ``log_space_size`` to compare such spaces).
+        """
+        log_space_size = self.log_space_size
+        if log_space_size == -np.inf:
             return 0
+        if log_space_size > 300:
+            return np.inf
         return np.prod([1.0] + [
             len(choice.variants)
             for choice in self.multichoices
         ])
 
-    def pick_random_mutations(self, n_mutations, sequence):
-        """Draw N random mutations"""
-        n_mutations = min(len(self.multichoices), n_mutations)
-        if n_mutations == 1:
-            index = np.random.randint(len(self.multichoices))
-            choice = self.multichoices[index]
-            return [
-                (choice.segment,
-                 choice.random_variant(sequence=sequence))
-            ]
-
-        return [
-            (choice_.segment, choice_.random_variant(sequence=sequence))
-            for choice_ in [
-                self.multichoices[i]
-                for i in np.random.choice(len(self.multichoices), n_mutations,
-                                          replace=False)
-            ]
-        ]
+    def pick_random_mutations(self, n_mutations, sequence,
+                              random_generator=None):
+        """Draw N random mutations.
 
+        The mutations are drawn by blocks by a ``MutationSampler`` which is
+        created on first use. ``random_generator`` is a numpy random
+        Generator used to draw the blocks (by default the global
+        ``np.random`` functions are used).
+        """
+        if self._sampler is None:
+            self._sampler = MutationSampler(self.multichoices)
+        return self._sampler.draw(n_mutations=n_mutations, sequence=sequence,
+                                  random_generator=random_generator)
 
-    def apply_random_mutations(self, n_mutations, sequence):
-        """Return a sequence with n random mutations applied."""
+    @staticmethod
+    def apply_mutations(mutations, sequence):
+        """Return a sequence with the mutations [(segment, variant)] applied.
+        """
         new_sequence = bytearray(sequence.encode())
-        for segment, seq in self.pick_random_mutations(n_mutations, sequence):
+        for segment, seq in mutations:
             start, end = segment
             new_sequence[start: end] = seq.encode()
         return new_sequence.decode()
 
+    def apply_random_mutations(self, n_mutations, sequence):
+        """Return a sequence with n random mutations applied.
+
+        If ``sequence`` is a ``SequenceState``, the mutations are applied to
+        it in place (and recorded in its journal) and the state is returned.
+        """
+        mutations = self.pick_random_mutations(n_mutations, sequence)
+        if isinstance(sequence, SequenceState):
+            sequence.apply_mutations(mutations)
+            return sequence
+        return self.apply_mutations(mutations, sequence)
+
     def all_variants(self, sequence):
         """Iterate through all sequence variants in this mutation space."""
         new_sequence = bytearray(sequence.encode())
@@ -286,52 +757,194 @@ class MutationSpace:
                 new_sequence[start: end] = variant
             yield new_sequence.decode()
 
+    def all_variants_in_place(self, sequence_state):
+        """Iterate through all variants by mutating a SequenceState in place.
+
+        At each iteration the state holds a new variant (and is yielded). The
+        state is restored at the end of the iteration. If the iteration is
+        interrupted, the state keeps the current variant, which can be made
+        definitive with ``sequence_state.commit()``.
+        """
+        variants_slots = [
+             [(choice_.segment, v) for v in choice_.variants]
+             for choice_ in self.multichoices
+        ]
+        for variants in itertools.product(*variants_slots):
+            sequence_state.apply_mutations(variants)
+            yield sequence_state
+            sequence_state.revert()
+
+    def all_variants_gray_code(self, sequence_state):
+        """Iterate through all variants, changing one choice at a time.
+
+        The variants are enumerated in reflected mixed-radix Gray code order
+        (Knuth's loopless algorithm H): between two consecutive variants,
+        exactly one of the choices of ``self.multichoices`` changes. Yields
+        couples ``(sequence_state, changed_segment)`` where the state holds
+        the current variant and ``changed_segment`` is the segment of the
+        choice which changed (for the first variant, it is the whole
+        ``choices_span``). This enables to re-evaluate the specifications
+        incrementally, with ``evaluate_delta``.
+
+        As in ``all_variants_in_place``, the state is restored at the end of
+        the iteration, and if the iteration is interrupted the state keeps
+        the current variant, which can be made definitive with
+        ``sequence_state.commit()``.
+        """
+        choices = self.multichoices
+        variants = [list(choice.variants) for choice in choices]
+        radices = [len(choice_variants) for choice_variants in variants]
+        n_choices = len(choices)
+        digits = [0 for choice in choices]
+        directions = [1 for choice in choices]
+        focus_pointers = list(range(n_choices + 1))
+        # The first variant is recorded in the journal: reverting it will
+        # revert all the (unrecorded) changes of the next variants.
+        sequence_state.apply_mutations([
+            (choice.segment, choice_variants[0])
+            for choice, choice_variants in zip(choices, variants)
+        ])
+        yield sequence_state, self.choices_span
+        while True:
+            j = focus_pointers[0]
+            focus_pointers[0] = 0
+            if j == n_choices:
+                break
+            digits[j] += directions[j]
+            if digits[j] in (0, radices[j] - 1):
+                directions[j] = -directions[j]
+                focus_pointers[j] = focus_pointers[j + 1]
+                focus_pointers[j + 1] = j + 1
+            segment = choices[j].segment
+            sequence_state.apply_mutations(
+                [(segment, variants[j][digits[j]])], record=False)
+            yield sequence_state, segment
+        sequence_state.revert()
+
+    def all_variants_with_pruning(self, sequence_state, prune):
+        """Iterate depth-first through the variants, pruning partial variants.
+
+        The choices of ``self.multichoices`` are assigned from left to right,
+        in the same order as in ``all_variants_in_place``. After each partial
+        assignment, ``prune(free_segment)`` is called, where ``free_segment``
+        is the segment ``(start, end)`` of the nucleotides which are not
+        assigned yet (the rest of the sequence is determined). If it returns
+        True, all variants completing this partial assignment are skipped.
+
+        As in ``all_variants_in_place``, the state holds each complete
+        variant when it is yielded, and if the iteration is interrupted the
+        state keeps the current variant, which can be made definitive with
+        ``sequence_state.commit()``.
+        """
+        choices = self.multichoices
+        variants = [list(choice.variants) for choice in choices]
+        last = len(choices) - 1
+        span_end = choices[-1].end
+        indices = [0 for choice in choices]
+        depth = 0
+        while depth >= 0:
+            if indices[depth] == len(variants[depth]):
+                indices[depth] = 0
+                depth -= 1
+                if depth >= 0:
+                    sequence_state.revert()
+                    indices[depth] += 1
+                continue
+            choice = choices[depth]
+            variant = variants[depth][indices[depth]]
+            sequence_state.apply_mutations([(choice.segment, variant)])
+            if depth == last:
+                yield sequence_state
+            elif not prune((choices[depth + 1].start, span_end)):
+                depth += 1
+                continue
+            sequence_state.revert()
+            indices[depth] += 1
+
+    def to_file(self, target):
+        """Save the mutation space in numpy's npz format.
+
+        ``target`` is a file name or a file-like object. The space can be
+        reloaded with ``MutationSpace.from_file``.
+        """
+        table = self.choices_table
+        variants = np.array([
+            ",".join(sorted(variants))
+            for variants in table.variants
+        ], dtype='U')
+        np.savez_compressed(
+            target,
+            offset=np.array(self.offset),
+            choice_ids=np.asarray(self.choice_ids, dtype='int32'),
+            starts=np.array(table.starts, dtype='int32'),
+            ends=np.array(table.ends, dtype='int32'),
+            variants_ids=np.array(table.variants_ids, dtype='int32'),
+            variants=variants
+        )
+
+    @staticmethod
+    def from_file(source):
+        """Load a mutation space saved with ``MutationSpace.to_file``.
+
+        ``source`` is a file name or a file-like object. The variants of
+        each choice are loaded as sets.
+        """
+        with np.load(source, allow_pickle=False) as data:
+            table = MutationChoicesTable()
+            table.starts.extend(data['starts'].tolist())
+            table.ends.extend(data['ends'].tolist())
+            table.variants_ids.extend(data['variants_ids'].tolist())
+            for line in data['variants'].tolist():
+                variants = set(line.split(",")) if line else set()
+                table.variants_indices[tuple(variants)] = len(table.variants)
+                table.variants.append(variants)
+            return MutationSpace(offset=int(data['offset']),
+                                 choice_ids=data['choice_ids'],
+                                 choices_table=table)
+
     @staticmethod
     def from_optimization_problem(problem, new_constraints=None):
         """Create a mutation space from a DNA optimization problem.
 
         This can be used either to initialize mutation spaces for new problems,
-        or to
-
+        or (if ``new_constraints`` is provided) to restrict the problem's
+        mutation space further with the nucleotide restrictions of new
+        constraints (see ``with_added_restrictions``).
         """
 
         sequence = problem.sequence
 
-        if new_constraints is None:
-            # The use of different nucleotide orders by arrays of 4
-            # "randomizes" the considered sequence variants, thus reducing
-            # the apparition of homopolymers during exhaustive searches
-            # (may create 4bp tandem repeats though). also increased solving
-            # time by 6% in tests.
-            variants = ["ACTG", "CTGA", "TGAC", "GACT"]
-            choices_index = [
-                MutationChoice((i, i+1), variants=variants[i % 4])
-                for i in range(len(sequence))
-            ]
-            constraints = problem.constraints
-        else:
-            choices_index = [c for c in problem.mutation_space.choices_index]
-            constraints = new_constraints
+        if new_constraints is not None:
+            return problem.mutation_space.with_added_restrictions([
+                choice
+                for cst in new_constraints
+                for choice in cst.restrict_nucleotides(sequence)
+            ])
+        choice_ids = np.full(len(sequence), DEFAULT_CHOICE, dtype='int32')
+        choices_table = MutationChoicesTable()
+        space = MutationSpace(choice_ids=choice_ids,
+                              choices_table=choices_table)
         mutation_choices = sorted([
             choice
             if isinstance(choice, MutationChoice)
             else MutationChoice(segment=choice[0], variants=set(choice[1]))
-            for cst in constraints
+            for cst in problem.constraints
             for choice in cst.restrict_nucleotides(sequence)
         ], key=lambda choice: (choice.end - choice.start, choice.start))
-        # print (new_constraints, choices_index)
-        # print ("mutation_choices", mutation_choices)
         for choice in mutation_choices:
-            underlying_choices = choices_index[choice.start: choice.end]
+            underlying_choices = space.choices_in(choice.start, choice.end)
             if underlying_choices == []:
                 new_choice = choice
             else:
-                new_choice = choice.percolate_with(set(underlying_choices))
+                new_choice = choice.percolate_with(underlying_choices)
             for choice in new_choice.extract_varying_region():
-                if choice.end > len(choices_index):
-                    choices_index += (choice.end - len(choices_index)) * [None]
-                for i in range(choice.start, choice.end):
-                    choices_index[i] = choice
-            # for i in range(new_choice.start, new_choice.end):
-            #     choices_index[i] = new_choice
-        return MutationSpace(choices_index)
+                if choice.end > len(space.choice_ids):
+                    space.choice_ids = np.concatenate([
+                        space.choice_ids,
+                        np.full(choice.end - len(space.choice_ids),
+                                NO_CHOICE, dtype='int32')
+                    ])
+                choice_id = choices_table.add(choice)
+                space.choice_ids[choice.start: choice.end] = choice_id
+        return MutationSpace(choice_ids=space.choice_ids,
+                             choices_table=choices_table)
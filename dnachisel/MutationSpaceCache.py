@@ -0,0 +1,193 @@
+"""Define the MutationSpaceCache class.
+
+Computing the mutation space of a problem requires to run the
+``restrict_nucleotides`` method of every constraint (on every codon of an
+``EnforceTranslation``, every nucleotide of an ``AvoidChanges``, etc.) and to
+percolate the resulting choices together. When the same construct is
+optimized again (for instance when a job is resubmitted) the MutationSpaceCache
+enables to reload the mutation space from disk instead.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+from .Location import Location
+from .MutationSpace import MutationSpace
+from .Specification import Specification
+from .version import __version__
+
+# Increment when the format of the cache files or of the keys changes.
+CACHE_FORMAT_VERSION = 1
+
+
+def _fingerprint(value, depth=0):
+    """Return a string representation of a specification parameter.
+
+    Unlike ``repr``, the representation does not contain memory addresses, so
+    it is the same from one Python session to the next.
+    """
+    if depth > 5:
+        return type(value).__name__
+    if (value is None) or isinstance(value, (bool, int, float, str, bytes)):
+        return repr(value)
+    if isinstance(value, Location):
+        return "Location(%s)" % value
+    if isinstance(value, np.ndarray):
+        return "array(%s)" % hashlib.sha1(value.tobytes()).hexdigest()
+    if isinstance(value, (list, tuple)):
+        return "[%s]" % ", ".join([_fingerprint(v, depth + 1) for v in value])
+    if isinstance(value, (set, frozenset)):
+        return "{%s}" % ", ".join(sorted([_fingerprint(v, depth + 1)
+                                          for v in value]))
+    if isinstance(value, dict):
+        return "{%s}" % ", ".join(sorted([
+            "%s: %s" % (_fingerprint(k, depth + 1), _fingerprint(v, depth + 1))
+            for k, v in value.items()
+        ]))
+    if callable(value):
+        return getattr(value, '__qualname__', type(value).__name__)
+    if hasattr(value, '__dict__'):
+        return "%s(%s)" % (type(value).__name__, _fingerprint(
+            {k: v for k, v in value.__dict__.items() if not k.startswith('_')},
+            depth + 1))
+    return type(value).__name__
+
+
+def specification_fingerprint(specification):
+    """Return a string identifying the specification and its parameters.
+
+    The fingerprint covers the specification's class, its attributes, and
+    the data attributes of its class and parent classes (such as the
+    ``codons_sequences`` of ``EnforceTranslation``).
+    """
+    class_attributes = {}
+    for klass in reversed(type(specification).__mro__):
+        for name, value in vars(klass).items():
+            if name.startswith('_') or isinstance(
+                    value, (staticmethod, classmethod, property)) or \
+                    callable(value):
+                continue
+            class_attributes[name] = value
+    attributes = {
+        name: value
+        for name, value in specification.__dict__.items()
+        if not name.startswith('_')
+    }
+    return "%s.%s(%s, %s)" % (
+        type(specification).__module__,
+        type(specification).__name__,
+        _fingerprint(class_attributes),
+        _fingerprint(attributes)
+    )
+
+
+class MutationSpaceCache:
+    """On-disk cache of the mutation spaces of optimization problems.
+
+    The mutation space of a problem is stored in a npz file (see
+    ``MutationSpace.to_file``) named after a hash of the problem's sequence
+    and of the constraints which restrict nucleotides (i.e. which implement
+    ``restrict_nucleotides``). The other constraints and the objectives have
+    no influence on the mutation space, and are not part of the key.
+
+    Examples
+    --------
+
+    >>> cache = MutationSpaceCache('mutation_spaces_cache/')
+    >>> problem = DnaOptimizationProblem(sequence, constraints=constraints,
+    >>>                                  mutation_space_cache=cache)
+    >>> # Running the same script again will load the mutation space.
+
+    Parameters
+    ----------
+
+    directory
+      Directory in which the mutation spaces are stored. It is created if it
+      does not exist.
+
+    Attributes
+    ----------
+
+    hits
+      Number of mutation spaces which were loaded from the cache.
+
+    misses
+      Number of mutation spaces which were not found in the cache.
+    """
+
+    def __init__(self, directory):
+        """Initialize."""
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, problem):
+        """Return the cache key (a hexadecimal hash) of the problem."""
+        hasher = hashlib.sha256()
+        hasher.update(("%d %s\n" % (CACHE_FORMAT_VERSION,
+                                    __version__)).encode())
+        hasher.update(problem.sequence.encode())
+        for constraint in problem.constraints:
+            if (type(constraint).restrict_nucleotides is
+                    Specification.restrict_nucleotides):
+                continue
+            hasher.update(b"\n")
+            hasher.update(specification_fingerprint(constraint).encode())
+        return hasher.hexdigest()
+
+    def filepath(self, key):
+        """Return the path of the file storing the given key."""
+        return os.path.join(self.directory, key + ".npz")
+
+    def get(self, problem):
+        """Return the cached mutation space of the problem, or None."""
+        filepath = self.filepath(self.key(problem))
+        if not os.path.exists(filepath):
+            self.misses += 1
+            return None
+        try:
+            mutation_space = MutationSpace.from_file(filepath)
+        except (IOError, ValueError, KeyError):
+            # Corrupted file (e.g. an interrupted write).
+            self.misses += 1
+            return None
+        self.hits += 1
+        return mutation_space
+
+    def store(self, problem, mutation_space):
+        """Store the mutation space of the problem."""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        filepath = self.filepath(self.key(problem))
+        # Write to a temporary file first so concurrent jobs never read
+        # a partially written file.
+        temporary_filepath = "%s.%d.tmp" % (filepath, os.getpid())
+        with open(temporary_filepath, 'wb') as f:
+            mutation_space.to_file(f)
+        os.replace(temporary_filepath, filepath)
+
+    def mutation_space(self, problem):
+        """Return the problem's mutation space, from the cache if possible.
+
+        If the mutation space is not in the cache, it is computed with
+        ``MutationSpace.from_optimization_problem`` and stored.
+        """
+        mutation_space = self.get(problem)
+        if mutation_space is None:
+            mutation_space = MutationSpace.from_optimization_problem(problem)
+            self.store(problem, mutation_space)
+        return mutation_space
+
+    def clear(self):
+        """Remove all the cached mutation spaces from the directory."""
+        if not os.path.exists(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".npz"):
+                os.remove(os.path.join(self.directory, filename))
+
+    def __repr__(self):
+        return "MutationSpaceCache(%s, %d hits, %d misses)" % (
+            self.directory, self.hits, self.misses)
@@ -0,0 +1,136 @@
+"""Search strategies for the random optimization of objectives.
+
+A search strategy decides, at each iteration of
+``DnaOptimizationProblem.optimize_by_random_mutations``, whether a set of
+random mutations can be tried, and whether the mutated sequence should
+replace the current sequence. The strategy of a problem is set via
+``problem.search_strategy``.
+"""
+
+from collections import deque
+
+import numpy as np
+
+
+class HillClimbing:
+    """Only accept mutations which strictly improve the objectives score.
+
+    This is the default search strategy.
+    """
+
+    def initialize(self, n_iterations):
+        """Reset the strategy before a new search of n_iterations."""
+        self.n_iterations = n_iterations
+
+    def allows(self, mutations):
+        """Return whether the mutations [(segment, variant)] can be tried."""
+        return True
+
+    def accepts(self, new_score, score, iteration):
+        """Return whether a mutated sequence with the new_score is kept."""
+        return new_score > score
+
+    def record(self, mutations):
+        """Record that the mutations [(segment, variant)] have been kept."""
+        pass
+
+    def __repr__(self):
+        return self.__class__.__name__ + "()"
+
+
+class SimulatedAnnealing(HillClimbing):
+    """Also accept worse mutants, with a probability decreasing in time.
+
+    A mutant whose score is lower than the current score by ``delta`` is
+    accepted with probability ``exp(-delta / T)``, where the temperature
+    ``T`` decreases from ``initial_temperature`` to ``final_temperature``
+    over the iterations of the search. The best sequence found during the
+    search is kept in the end.
+
+    Parameters
+    ----------
+
+    initial_temperature
+      Temperature at the start of the search. It should be comparable to
+      the score differences caused by a single set of mutations.
+
+    final_temperature
+      Temperature at the end of the search.
+
+    schedule
+      Either 'exponential' or 'linear' for a geometric or linear decrease of
+      the temperature, or a function ``(progress) => temperature`` where
+      ``progress`` goes from 0 to 1 during the search.
+    """
+
+    def __init__(self, initial_temperature=1.0, final_temperature=0.01,
+                 schedule='exponential'):
+        """Initialize."""
+        self.initial_temperature = initial_temperature
+        self.final_temperature = final_temperature
+        self.schedule = schedule
+
+    def temperature(self, iteration):
+        """Return the temperature at the given iteration of the search."""
+        progress = 1.0 * iteration / max(1, self.n_iterations - 1)
+        t0, t1 = self.initial_temperature, self.final_temperature
+        if self.schedule == 'exponential':
+            return t0 * (1.0 * t1 / t0) ** progress
+        elif self.schedule == 'linear':
+            return t0 + (t1 - t0) * progress
+        else:
+            return self.schedule(progress)
+
+    def accepts(self, new_score, score, iteration):
+        """Accept better mutants, and worse mutants with some probability."""
+        if new_score > score:
+            return True
+        temperature = self.temperature(iteration)
+        if temperature <= 0:
+            return False
+        return np.random.rand() < np.exp((new_score - score) / temperature)
+
+    def __repr__(self):
+        return "SimulatedAnnealing(%s -> %s, %s)" % (
+            self.initial_temperature, self.final_temperature, self.schedule)
+
+
+class TabuSearch(HillClimbing):
+    """Accept non-worsening mutants, and forbid recently-mutated segments.
+
+    Accepting mutants with an equal score enables the search to cross the
+    "plateaus" of the objective. Segments which have been recently mutated
+    are tabu (cannot be mutated again) so that the search does not keep
+    undoing its own moves.
+
+    Parameters
+    ----------
+
+    tabu_size
+      Number of most recently mutated segments which cannot be mutated.
+    """
+
+    def __init__(self, tabu_size=20):
+        """Initialize."""
+        self.tabu_size = tabu_size
+
+    def initialize(self, n_iterations):
+        """Reset the tabu list before a new search."""
+        self.n_iterations = n_iterations
+        self.tabu_segments = deque(maxlen=self.tabu_size)
+
+    def allows(self, mutations):
+        """Forbid mutations on recently mutated segments."""
+        return not any(segment in self.tabu_segments
+                       for segment, variant in mutations)
+
+    def accepts(self, new_score, score, iteration):
+        """Accept mutants with a score at least as good as the current."""
+        return new_score >= score
+
+    def record(self, mutations):
+        """Add the newly mutated segments to the tabu list."""
+        self.tabu_segments.extend(segment for segment, variant in mutations)
+
+    def __repr__(self):
+        return "TabuSearch(%d)" % self.tabu_size
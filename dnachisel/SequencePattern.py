@@ -119,6 +119,21 @@ class SequencePattern:
             for start, end, strand in matches
         ]
 
+    def has_match(self, sequence, location=None):
+        """Return whether the expression matches anywhere in the sequence.
+
+        This is faster than ``find_matches`` as it stops at the first match.
+        See ``find_matches`` for the parameters.
+        """
+        if location is not None:
+            sequence = location.extract_sequence(sequence)
+        if self.compiled_expression.search(sequence) is not None:
+            return True
+        if self.in_both_strands:
+            reverse = reverse_complement(sequence)
+            return self.compiled_expression.search(reverse) is not None
+        return False
+
     def __str__(self):
         return self.expression + ("" if self.name is None else
                                   " (%s)" % self.name)
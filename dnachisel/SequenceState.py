@@ -0,0 +1,110 @@
+"""Define the SequenceState class.
+
+SequenceState stores the sequence of a DnaOptimizationProblem as a mutable
+array, so that mutations can be applied (and reverted) in place, without
+rebuilding a new string of the whole sequence at each mutation.
+"""
+
+import numpy as np
+
+
+class SequenceState:
+    """Mutable DNA sequence with a journal of the mutations applied.
+
+    Examples
+    --------
+
+    >>> state = SequenceState("ATTGCCA")
+    >>> state.apply_mutations([((1, 3), "GC")])
+    >>> state.sequence  # => "AGCGCCA"
+    >>> state.revert()
+    >>> state.sequence  # => "ATTGCCA"
+
+    Parameters
+    ----------
+
+    sequence
+      A string of ATGC characters (upper case).
+
+    Attributes
+    ----------
+
+    array
+      A numpy uint8 array of the ASCII codes of the nucleotides. Slices of
+      this array can be read without any copy.
+
+    journal
+      List of the groups of mutations applied since the last ``commit()``.
+      Each entry enables to revert the corresponding group of mutations.
+    """
+
+    def __init__(self, sequence):
+        """Initialize."""
+        self.array = np.frombuffer(sequence.encode(), dtype='uint8').copy()
+        self._sequence = sequence
+        self.journal = []
+
+    @property
+    def sequence(self):
+        """Return the sequence as a string (computed only when necessary)."""
+        if self._sequence is None:
+            self._sequence = self.array.tobytes().decode()
+        return self._sequence
+
+    def set_sequence(self, sequence):
+        """Replace the whole sequence, and clear the journal."""
+        if len(sequence) == len(self.array):
+            self.array[:] = np.frombuffer(sequence.encode(), dtype='uint8')
+        else:
+            self.array = np.frombuffer(sequence.encode(), dtype='uint8').copy()
+        self._sequence = sequence
+        self.journal = []
+
+    def apply_mutations(self, mutations, record=True):
+        """Apply the mutations and record them in the journal.
+
+        Parameters
+        ----------
+
+        mutations
+          A list ``[(segment, variant), ...]`` where each ``segment`` is a
+          couple ``(start, end)`` and ``variant`` is the new ATGC sequence
+          of the segment.
+
+        record
+          If False, the mutations are not recorded in the journal. They will
+          only be reverted by the revert of a previous group of mutations
+          covering the same segments.
+        """
+        changes = []
+        for (start, end), variant in mutations:
+            if record:
+                changes.append((start, self.array[start: end].copy()))
+            self.array[start: end] = np.frombuffer(variant.encode(),
+                                                   dtype='uint8')
+        if record:
+            self.journal.append((changes, self._sequence))
+        self._sequence = None
+
+    def revert(self):
+        """Revert the last group of mutations recorded in the journal."""
+        changes, sequence = self.journal.pop()
+        for start, previous_array in changes[::-1]:
+            self.array[start: start + len(previous_array)] = previous_array
+        self._sequence = sequence
+
+    def commit(self):
+        """Clear the journal, making the current mutations definitive."""
+        self.journal = []
+
+    def __getitem__(self, index):
+        """Return the nucleotide or subsequence at the given index or slice."""
+        if self._sequence is not None:
+            return self._sequence[index]
+        if isinstance(index, slice):
+            return self.array[index].tobytes().decode()
+        return chr(self.array[index])
+
+    def __len__(self):
+        """Return the sequence length."""
+        return len(self.array)
@@ -328,15 +328,27 @@ class ProblemConstraintsEvaluations(SpecEvaluations):
     specifications_role = "constraint"
 
     @staticmethod
-    def from_problem(problem):
+    def from_problem(problem, changed_segments=None,
+                     previous_evaluations=None):
         """Create an instance by evaluating all constraints in the problem.
 
         The ``problem`` is a DnaChisel DnaOptimizationProblem.
 
+        If ``previous_evaluations`` (the evaluations of the problem before
+        mutations in ``changed_segments``) is provided, the specifications
+        are re-evaluated incrementally with ``evaluate_delta``. Else, the
+        evaluations go through the problem's ``evaluation_cache``.
         """
+        if previous_evaluations is None:
+            return ProblemConstraintsEvaluations([
+                problem.evaluation_cache.evaluate(specification, problem)
+                for specification in problem.constraints
+            ], problem=problem)
         return ProblemConstraintsEvaluations([
-            specification.evaluate(problem)
-            for specification in problem.constraints
+            specification.evaluate_delta(problem, changed_segments,
+                                         previous_evaluation)
+            for specification, previous_evaluation in zip(
+                problem.constraints, previous_evaluations)
         ], problem=problem)
 
     def success_failure_color(self, evaluation):
@@ -363,15 +375,27 @@ class ProblemObjectivesEvaluations(SpecEvaluations):
     specifications_role = "objective"
 
     @staticmethod
-    def from_problem(problem):
+    def from_problem(problem, changed_segments=None,
+                     previous_evaluations=None):
         """Create an instance by evaluating all objectives in the problem.
 
         The ``problem`` is a DnaChisel DnaOptimizationProblem.
 
+        If ``previous_evaluations`` (the evaluations of the problem before
+        mutations in ``changed_segments``) is provided, the specifications
+        are re-evaluated incrementally with ``evaluate_delta``. Else, the
+        evaluations go through the problem's ``evaluation_cache``.
         """
+        if previous_evaluations is None:
+            return ProblemObjectivesEvaluations([
+                problem.evaluation_cache.evaluate(specification, problem)
+                for specification in problem.objectives
+            ], problem=problem)
         return ProblemObjectivesEvaluations([
-            specification.evaluate(problem)
-            for specification in problem.objectives
+            specification.evaluate_delta(problem, changed_segments,
+                                         previous_evaluation)
+            for specification, previous_evaluation in zip(
+                problem.objectives, previous_evaluations)
         ], problem=problem)
 
     def success_failure_color(self, evaluation):
@@ -31,12 +31,21 @@ class Specification:
     boost
       Relative importance of the Specification's score in a multi-specification
       problem.
+
+    Notes
+    -----
+
+    Subclasses whose evaluation only depends on their parameters and on the
+    subsequence at ``self.location`` can set the class attribute
+    ``cacheable = True`` so that their evaluations are memoized by the
+    problem's ``EvaluationCache``.
     """
 
     best_possible_score = None
     optimize_passively = False
     enforced_by_nucleotide_restrictions = False
     priority = 0
+    cacheable = False
 
     def __init__(self, evaluate=None, boost=1.0):
         """Initialize."""
@@ -62,15 +71,89 @@ class Specification:
         """
         return self
 
+    def localization_region(self):
+        """Return the region outside of which the specification is irrelevant.
+
+        ``self.localized(location)`` must return a ``VoidSpecification`` for
+        any location which does not overlap this region. This is used by
+        problems to index their specifications spatially (see
+        ``SpecificationsIndex``). The default, None, means that the
+        specification can be relevant at any location.
+        """
+        return None
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Return the evaluation of the specification after a few mutations.
+
+        This is used by the random-mutation solvers to re-score only the
+        parts of the sequence affected by a mutation. The default behavior is
+        to re-evaluate the specification completely, subclasses can implement
+        a faster, incremental evaluation.
+
+        Parameters
+        ----------
+
+        problem
+          The problem, whose sequence has been mutated.
+
+        changed_segments
+          A list ``[(start1, end1), (start2, end2)...]`` of the segments of
+          the sequence which were mutated since ``previous_evaluation``.
+
+        previous_evaluation
+          The evaluation of this very specification on the problem's
+          sequence before the mutations.
+
+        Must return the same ``SpecEvaluation`` as ``self.evaluate(problem)``
+        (up to the order of the locations).
+        """
+        return self.evaluate(problem)
+
+    def score_upper_bound(self, problem, free_segment):
+        """Return an upper bound of the score, for a partially fixed sequence.
+
+        The bound must hold for all the sequences which are identical to the
+        problem's sequence outside of ``free_segment``, a couple
+        ``(start, end)`` of the positions which are yet to be decided. This is
+        used by the exhaustive solvers to prune the search. The default
+        returns ``self.best_possible_score`` (None meaning "no bound known").
+        """
+        return self.best_possible_score
+
+    def passes(self, problem):
+        """Return whether the problem's sequence verifies the specification.
+
+        The default is ``self.evaluate(problem).passes``. Subclasses can
+        implement a faster test, e.g. stopping at the first breach found and
+        building no evaluation message or locations.
+        """
+        return self.evaluate(problem).passes
+
     def copy_with_changes(self, **kwargs):
         """Return a copy of the Specification with modified properties.
 
         For instance ``new_spec = spec.copy_with_changes(boost=10)``.
         """
+        cache_root = self.cache_root
         new_specification = copy.copy(self)
         new_specification.__dict__.update(kwargs)
+        if not set(kwargs).issubset(('location', 'boost')):
+            cache_root = new_specification
+        new_specification._cache_root = cache_root
         return new_specification
 
+    @property
+    def cache_root(self):
+        """Return the specification this one was copied from, for caching.
+
+        Copies which only differ by their location or boost (such as the
+        results of ``localized``) share the same root, so an
+        ``EvaluationCache`` can identify them by their root and location.
+        """
+        if '_cache_root' not in self.__dict__:
+            self._cache_root = self
+        return self._cache_root
+
     def initialize_on_problem(self, problem, role="constraint"):
         """Complete specification initialization when the sequence gets known.
 
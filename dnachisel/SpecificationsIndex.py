@@ -0,0 +1,90 @@
+"""Define the SpecificationsIndex class.
+
+Problems created from annotated records can have thousands of
+specifications, most of them irrelevant for any given location of the
+sequence. The SpecificationsIndex is an interval tree which enables to find
+the specifications which can be relevant at a location in O(log(n) + k).
+"""
+
+
+class SpecificationsIndex:
+    """Interval tree of specifications, by their localization region.
+
+    The region of each specification is given by its
+    ``localization_region()`` method. Specifications without region (None)
+    are considered relevant everywhere.
+
+    Examples
+    --------
+
+    >>> index = SpecificationsIndex(problem.constraints)
+    >>> index.overlapping(Location(1000, 1050))  # => relevant constraints
+
+    Parameters
+    ----------
+
+    specifications
+      A list of specifications.
+    """
+
+    def __init__(self, specifications):
+        """Initialize."""
+        self.specifications = specifications
+        self.n_specifications = len(specifications)
+        self.unlocalized_indices = []
+        intervals = []
+        for i, specification in enumerate(specifications):
+            region = specification.localization_region()
+            if region is None:
+                self.unlocalized_indices.append(i)
+            else:
+                intervals.append((region.start, region.end, i))
+        intervals.sort()
+        self.starts = [start for start, end, i in intervals]
+        self.ends = [end for start, end, i in intervals]
+        self.indices = [i for start, end, i in intervals]
+        # The intervals, sorted by start, form an implicit balanced tree
+        # where the root of the range [lo, hi) is at (lo + hi) // 2. Each
+        # node stores the largest end in its subtree.
+        self.max_ends = list(self.ends)
+        self._compute_max_ends(0, len(intervals))
+
+    def _compute_max_ends(self, lo, hi):
+        """Fill self.max_ends for the subtree of range [lo, hi)."""
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        for child_max_end in (self._compute_max_ends(lo, mid),
+                              self._compute_max_ends(mid + 1, hi)):
+            if child_max_end is not None:
+                self.max_ends[mid] = max(self.max_ends[mid], child_max_end)
+        return self.max_ends[mid]
+
+    def is_index_of(self, specifications):
+        """Return whether the index is up-to-date for this specifications list.
+        """
+        return ((specifications is self.specifications) and
+                (len(specifications) == self.n_specifications))
+
+    def overlapping(self, location):
+        """Return the specifications whose region overlaps the location.
+
+        The specifications are returned in their original order. Regions
+        which only touch the location are also returned.
+        """
+        start, end = location.start, location.end
+        result = list(self.unlocalized_indices)
+        ranges = [(0, len(self.starts))]
+        while ranges:
+            lo, hi = ranges.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self.max_ends[mid] < start:
+                continue
+            ranges.append((lo, mid))
+            if self.starts[mid] <= end:
+                if self.ends[mid] >= start:
+                    result.append(self.indices[mid])
+                ranges.append((mid + 1, hi))
+        return [self.specifications[i] for i in sorted(result)]
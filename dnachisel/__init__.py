@@ -22,6 +22,9 @@ from .builtin_specifications import (
 
 from .Specification import Specification
 from .SpecEvaluation import SpecEvaluation
+from .SearchStrategies import HillClimbing, SimulatedAnnealing, TabuSearch
+from .EvaluationCache import EvaluationCache
+from .MutationSpaceCache import MutationSpaceCache
 
 from .SequencePattern import (
     DnaNotationPattern,
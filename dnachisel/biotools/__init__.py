@@ -20,6 +20,7 @@ from .biotools import (
     sequences_differences,
     sequences_differences_array,
     sequences_differences_segments,
+    sequence_to_array,
     sequence_to_biopython_record,
     subdivide_window,
     translate,
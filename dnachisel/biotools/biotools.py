@@ -192,6 +192,17 @@ def windows_overlap(window1, window2):
         return None
 
 
+def sequence_to_array(sequence):
+    """Return a numpy uint8 array of the ASCII codes of the sequence.
+
+    If the sequence is already a uint8 array (e.g. a slice of a problem's
+    ``sequence_array``), it is returned as-is, without copy.
+    """
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    return np.frombuffer(sequence.encode(), dtype="uint8")
+
+
 def gc_content(sequence, window_size=None):
     """Compute global or local GC content.
 
@@ -199,7 +210,7 @@ def gc_content(sequence, window_size=None):
     ----------
 
     sequence
-      An ATGC DNA sequence (upper case!)
+      An ATGC DNA sequence (upper case!), or a uint8 array of its ASCII codes
 
     window_size
       If provided, the local GC content for the different sliding windows of
@@ -217,7 +228,7 @@ def gc_content(sequence, window_size=None):
     # The code is a little cryptic but speed gain is 300x
     # compared with pure-python string operations
 
-    arr = np.fromstring(sequence + "", dtype="uint8")
+    arr = sequence_to_array(sequence)
     arr_GCs = (arr == 71) | (arr == 67)  # 67=C, 71=G
 
     if window_size is None:
@@ -407,13 +418,13 @@ def crop_record(record, crop_start, crop_end, features_suffix=" (part)"):
 def sequences_differences_array(seq1, seq2):
     """Return an array [0, 0, 1, 0, ...] with 1s for sequence differences.
 
-    seq1, seq2 should both be ATGC strings.
+    seq1, seq2 should both be ATGC strings, or uint8 arrays of ASCII codes.
     """
     if len(seq1) != len(seq2):
         raise ValueError("Only use on same-size sequences (%d, %d)" %
                          (len(seq1), len(seq2)))
-    arr1 = np.fromstring(seq1, dtype="uint8")
-    arr2 = np.fromstring(seq2, dtype="uint8")
+    arr1 = sequence_to_array(seq1)
+    arr2 = sequence_to_array(seq2)
     return arr1 != arr2
 
 
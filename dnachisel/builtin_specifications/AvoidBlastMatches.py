@@ -36,6 +36,7 @@ class AvoidBlastMatches(Specification):
     """
     priority = -2
     best_possible_score = 0
+    cacheable = True
 
     def __init__(self, blast_db=None, sequences=None, word_size=4,
                  perc_identity=100, num_alignments=100000, num_threads=3,
@@ -126,6 +127,10 @@ class AvoidBlastMatches(Specification):
             self, problem, score=score, locations=locations,
             message="Failed - matches at %s" % locations)
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the evaluation."""
         new_location = self.location.overlap_region(location)
@@ -83,7 +83,12 @@ class AvoidChanges(Specification):
         in nucleotides equal to ``localization_interval_length`.`
         """
         target = self.target_sequence
-        sequence = self.extract_subsequence(problem.sequence)
+        if ((self.indices is None) and (self.location is not None) and
+                (self.location.strand != -1)):
+            sequence = problem.sequence_array[self.location.start:
+                                              self.location.end]
+        else:
+            sequence = self.extract_subsequence(problem.sequence)
         discrepancies = np.nonzero(
             sequences_differences_array(sequence, target))[0]
 
@@ -105,6 +110,10 @@ class AvoidChanges(Specification):
         return SpecEvaluation(self, problem, score=-len(discrepancies),
                               locations=locations)
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Localize the spec to the overlap of its location and the new.
         """
@@ -28,6 +28,7 @@ class AvoidHairpins(Specification):
     """
 
     best_possible_score = 0
+    cacheable = True
 
     def __init__(self, stem_size=20, hairpin_window=200, location=None,
                  boost=1.0):
@@ -51,18 +52,65 @@ class AvoidHairpins(Specification):
         """Return the score (-number_of_hairpins) and hairpins locations."""
         sequence = self.location.extract_sequence(problem.sequence)
         reverse = reverse_complement(sequence)
-        locations = []
+        hairpins = {}
         for i in range(len(sequence) - self.hairpin_window):
-            word = sequence[i:i + self.stem_size]
-            rest = reverse[-(i + self.hairpin_window):-(i + self.stem_size)]
-            if word in rest:
-                locations.append((i, i+rest.index(word) + len(word)))
-        score = -len(locations)
-        locations = group_nearby_segments(locations, max_start_spread=10)
+            self.find_hairpin_at(i, sequence, reverse, hairpins)
+        return self.evaluation_from_hairpins(problem, hairpins)
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Only look for hairpins starting in windows overlapping changes."""
+        if ((self.location.strand == -1) or
+                ('hairpins' not in previous_evaluation.data)):
+            return self.evaluate(problem)
+        hairpins = previous_evaluation.data['hairpins']
+        lstart = self.location.start
+        n_starts = len(self.location) - self.hairpin_window
+        for start, end in changed_segments:
+            start = max(0, start - lstart - self.hairpin_window + 1)
+            end = min(n_starts, end - lstart)
+            if start >= end:
+                continue
+            if hairpins is previous_evaluation.data['hairpins']:
+                hairpins = dict(hairpins)
+            sequence = problem.sequence[lstart + start:
+                                        lstart + end + self.hairpin_window]
+            reverse = reverse_complement(sequence)
+            for i in range(start, end):
+                hairpins.pop(i, None)
+                self.find_hairpin_at(i, sequence, reverse, hairpins,
+                                     offset=start)
+        if hairpins is previous_evaluation.data['hairpins']:
+            return previous_evaluation
+        return self.evaluation_from_hairpins(problem, hairpins)
+
+    def find_hairpin_at(self, i, sequence, reverse, hairpins, offset=0):
+        """Add the hairpin whose stem starts at index i to the dict, if any.
+
+        The ``sequence`` is the segment of the location's sequence starting
+        at index ``offset``, and ``reverse`` is its reverse-complement. The
+        dict is of the form ``{i: (i, hairpin_end)}``.
+        """
+        i_, L = i - offset, len(sequence)
+        word = sequence[i_:i_ + self.stem_size]
+        rest = reverse[L - (i_ + self.hairpin_window):
+                       L - (i_ + self.stem_size)]
+        if word in rest:
+            hairpins[i] = (i, i + rest.index(word) + len(word))
+
+    def evaluation_from_hairpins(self, problem, hairpins):
+        """Return the SpecEvaluation for the given dict of hairpins."""
+        score = -len(hairpins)
+        locations = group_nearby_segments(list(hairpins.values()),
+                                          max_start_spread=10)
         locations = sorted([Location(l[0][0], l[-1][1] + self.hairpin_window)
                             for l in locations])
 
-        return SpecEvaluation(self, problem, score, locations=locations)
+        return SpecEvaluation(self, problem, score, locations=locations,
+                              data=dict(hairpins=hairpins))
+
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
 
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the spec, make sure no neighbouring hairpin is created."""
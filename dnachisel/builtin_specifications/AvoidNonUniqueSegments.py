@@ -157,30 +157,103 @@ class AvoidNonuniqueSegments(Specification):
 
     def global_evaluation(self, problem):
         extract_kmer = self.get_kmer_extractor(problem.sequence)
+        kmers = {}
         kmers_locations = defaultdict(lambda: [])
         start, end = self.extended_location.start, self.extended_location.end
         for i in range(start, end - self.min_length):
-            kmers_locations[extract_kmer(i)].append((i, i + self.min_length))
+            kmer = kmers[i] = extract_kmer(i)
+            kmers_locations[kmer].append(i)
+        nonunique_kmers = set(
+            kmer
+            for kmer, indices in kmers_locations.items()
+            if len(indices) > 1
+        )
+        return self.evaluation_from_kmers(problem, kmers, kmers_locations,
+                                          nonunique_kmers)
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Only update the k-mers overlapping the changed segments.
+
+        Localized versions of the specification are simply re-evaluated as
+        their evaluation only concerns the k-mers around the localization.
+        """
+        data = previous_evaluation.data
+        if (self.localization_data is not None) or ('kmers' not in data):
+            return self.evaluate(problem)
+        k = self.min_length
+        start, end = self.extended_location.start, self.extended_location.end
+        changed_indices = sorted(set(
+            i
+            for (seg_start, seg_end) in changed_segments
+            for i in range(max(start, seg_start - k + 1),
+                           min(end - k, seg_end))
+        ))
+        if changed_indices == []:
+            return previous_evaluation
+
+        kmers = dict(data['kmers'])
+        kmers_locations = dict(data['kmers_locations'])
+        nonunique_kmers = set(data['nonunique_kmers'])
+
+        def update_kmer_status(kmer):
+            indices = kmers_locations[kmer]
+            if len(indices) == 0:
+                kmers_locations.pop(kmer)
+            if len(indices) > 1:
+                nonunique_kmers.add(kmer)
+            else:
+                nonunique_kmers.discard(kmer)
+
+        for i in changed_indices:
+            kmer = kmers[i]
+            kmers_locations[kmer] = [j for j in kmers_locations[kmer]
+                                     if j != i]
+            update_kmer_status(kmer)
+        for i in changed_indices:
+            subsequence = problem.sequence[i: i + k]
+            if self.include_reverse_complement:
+                subsequence = min(subsequence, reverse_complement(subsequence))
+            kmers[i] = subsequence
+            kmers_locations[subsequence] = (
+                kmers_locations.get(subsequence, []) + [i])
+            update_kmer_status(subsequence)
+        return self.evaluation_from_kmers(problem, kmers, kmers_locations,
+                                          nonunique_kmers)
+
+    def evaluation_from_kmers(self, problem, kmers, kmers_locations,
+                              nonunique_kmers):
+        """Return the SpecEvaluation for the given k-mers data.
+
+        ``kmers`` is a dict ``{index: kmer}``, ``kmers_locations`` a dict
+        ``{kmer: [indices]}`` and ``nonunique_kmers`` the set of all k-mers
+        found several times.
+        """
+        data = dict(kmers=kmers, kmers_locations=kmers_locations,
+                    nonunique_kmers=nonunique_kmers)
         locations = sorted([
-            Location(start_, end_)
-            for locations_list in kmers_locations.values()
-            for start_, end_ in locations_list
-            if len(locations_list) > 1
-            and (self.location.start < start_ < end_ < self.location.end)
+            Location(start_, start_ + self.min_length)
+            for kmer in nonunique_kmers
+            for start_ in kmers_locations[kmer]
+            if (self.location.start < start_ <
+                start_ + self.min_length < self.location.end)
         ], key=lambda l: l.start)
 
         if locations == []:
             return SpecEvaluation(
-                self, problem, score=0,
+                self, problem, score=0, data=data,
                 message="Passed: no nonunique %d-mer found." % self.min_length)
 
         return SpecEvaluation(
             self, problem, score=-len(locations),
-            locations=locations,
+            locations=locations, data=data,
             message="Failed, the following positions are the first occurences "
                     "of non-unique segments %s" % locations)
 
 
+    def localization_region(self):
+        """Return the extended location (see Specification)."""
+        return self.extended_location
+
     def localized(self, location, problem, with_righthand=True):
         """Localize the evaluation."""
 
@@ -2,6 +2,7 @@
 
 from .PatternSpecification import PatternSpecification
 from ..SpecEvaluation import SpecEvaluation
+from ..SequencePattern import DnaNotationPattern
 
 from dnachisel.Location import Location
 
@@ -24,10 +25,67 @@ class AvoidPattern(PatternSpecification):
 
     """
     best_possible_score = 0
+    cacheable = True
 
     def evaluate(self, problem):
         """Return score=-number_of_occurences. And patterns locations."""
         locations = self.pattern.find_matches(problem.sequence, self.location)
+        return self.evaluation_from_matches(problem, locations)
+
+    def passes(self, problem):
+        """Return True iff the pattern is absent (stops at the first match).
+        """
+        return not self.pattern.has_match(problem.sequence, self.location)
+
+    def score_upper_bound(self, problem, free_segment):
+        """Return minus the number of matches outside of the free segment."""
+        free_start, free_end = free_segment
+        location_start, location_end = self.location.start, self.location.end
+        n_matches = 0
+        for start, end in [(location_start, min(location_end, free_start)),
+                           (max(location_start, free_end), location_end)]:
+            if end > start:
+                location = Location(start, end, self.location.strand)
+                n_matches += len(self.pattern.find_matches(
+                    problem.sequence_state, location))
+        return -n_matches
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Re-scan the pattern only around the changed segments.
+
+        Matches found before the changes are kept, except those entirely
+        included in the re-scanned windows. This is only done for patterns
+        of fixed size (DnaNotationPattern), as the matches of other regular
+        expressions can depend on the context.
+        """
+        fixed_size = isinstance(self.pattern, DnaNotationPattern)
+        if (self.location.strand == -1) or not fixed_size:
+            return self.evaluate(problem)
+        windows = []
+        for start, end in sorted(changed_segments):
+            start = max(self.location.start, start - self.pattern.size + 1)
+            end = min(self.location.end, end + self.pattern.size - 1)
+            if start >= end:
+                continue
+            if len(windows) and (start <= windows[-1][1]):
+                windows[-1][1] = max(end, windows[-1][1])
+            else:
+                windows.append([start, end])
+        if windows == []:
+            return previous_evaluation
+        locations = [
+            location
+            for location in previous_evaluation.locations
+            if not any(start <= location.start and location.end <= end
+                       for start, end in windows)
+        ]
+        for start, end in windows:
+            locations += self.pattern.find_matches(problem.sequence,
+                                                   Location(start, end, 1))
+        return self.evaluation_from_matches(problem, locations)
+
+    def evaluation_from_matches(self, problem, locations):
+        """Return the SpecEvaluation corresponding to the matches found."""
         score = -len(locations)
         if score == 0:
             message = "Passed. Pattern not found !"
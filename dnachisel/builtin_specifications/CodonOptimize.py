@@ -64,6 +64,7 @@ class CodonOptimize(CodonSpecification):
     """
 
     best_possible_score = 0
+    cacheable = True
     localization_group_spread = 3
 
     def __init__(self, species=None, location=None, mode='best_codon',
@@ -180,21 +181,49 @@ class CodonOptimize(CodonSpecification):
             subsequence[3 * i: 3 * (i + 1)]
             for i in range(int(length / 3))
         ]
-        CT = CODONS_TRANSLATIONS
-        current_usage, optimal_usage = [np.array(e) for e in zip(*[
-            (self.codon_usage_table[codon],
-             self.codon_usage_table['best_frequencies'][CT[codon]])
+        non_optimality = np.array([
+            self.codon_non_optimality(codon)
             for codon in codons
-        ])]
-        non_optimality = optimal_usage - current_usage
+        ])
+        return self.evaluation_from_non_optimality(problem, non_optimality)
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Only re-score the codons overlapping the changed segments.
+
+        This is only possible in mode 'best_codon' where the score of each
+        codon is independent of the rest of the sequence.
+        """
+        if ((self.mode != 'best_codon') or
+                ('non_optimality' not in previous_evaluation.data)):
+            return self.evaluate(problem)
+        indices = self.changed_codons_indices(changed_segments)
+        if indices == []:
+            return previous_evaluation
+        non_optimality = previous_evaluation.data['non_optimality'].copy()
+        for index in indices:
+            codon = self.extract_codon(problem.sequence, index)
+            non_optimality[index] = self.codon_non_optimality(codon)
+        return self.evaluation_from_non_optimality(problem, non_optimality)
+
+    def codon_non_optimality(self, codon):
+        """Return the frequency difference between the codon and the best
+        synonymous codon."""
+        best_frequencies = self.codon_usage_table['best_frequencies']
+        return (best_frequencies[CODONS_TRANSLATIONS[codon]] -
+                self.codon_usage_table[codon])
+
+    def evaluation_from_non_optimality(self, problem, non_optimality):
+        """Return the evaluation for an array of codons non-optimalities."""
         nonoptimal_indices = 3 * np.nonzero(non_optimality)[0]
         locations = self.codons_indices_to_locations(nonoptimal_indices)
         score = -non_optimality.sum()
         return SpecEvaluation(
             self, problem, score=score, locations=locations,
             message="Codon opt. on window %s scored %.02E" %
-                    (self.location, score)
+                    (self.location, score),
+            data=dict(non_optimality=non_optimality)
         )
+
     def evaluate_harmonized(self, problem):
         """Return the evaluation for mode==harmonized."""
         subsequence = self.location.extract_sequence(problem.sequence)
@@ -2,6 +2,7 @@
 from ..Specification import Specification
 from .VoidSpecification import VoidSpecification
 from ..Location import Location
+from ..biotools import reverse_complement
 
 class CodonSpecification(Specification):
     """Special class for dealing with codon.
@@ -10,6 +11,10 @@ class CodonSpecification(Specification):
 
     """
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Generic localization method for codon specifications.
 
@@ -45,3 +50,31 @@ class CodonSpecification(Specification):
                                                 end_codon)
         else:
             return self
+
+    def changed_codons_indices(self, changed_segments):
+        """Return the sorted indices of the codons overlapping the segments.
+
+        Codon indices are counted from the start of the coding sequence, i.e.
+        from the end of the location if the location's strand is -1.
+        """
+        w_start, w_end = self.location.start, self.location.end
+        indices = set()
+        for start, end in changed_segments:
+            start, end = max(w_start, start), min(w_end, end)
+            if start >= end:
+                continue
+            if self.location.strand != -1:
+                first, last = (start - w_start) // 3, (end - 1 - w_start) // 3
+            else:
+                first, last = (w_end - end) // 3, (w_end - 1 - start) // 3
+            indices.update(range(first, last + 1))
+        return sorted(indices)
+
+    def extract_codon(self, sequence, index):
+        """Return the sequence of the index-th codon of the location."""
+        if self.location.strand != -1:
+            start = self.location.start + 3 * index
+            return sequence[start: start + 3]
+        else:
+            end = self.location.end - 3 * index
+            return reverse_complement(sequence[end - 3: end])
@@ -31,6 +31,7 @@ class EnforceChoice(Specification):
     """
     localization_interval_length = 6  # used when optimizing
     best_possible_score = 0
+    cacheable = True
     enforced_by_nucleotide_restrictions = True
 
     def __init__(self, choices=None, enzymes=None, location=None, boost=1.0):
@@ -47,6 +47,7 @@ class EnforceGCContent(Specification):
     """
 
     best_possible_score = 0
+    cacheable = True
     locations_span = 50  # The resolution will use locations size
 
     def __init__(self, mini=0, maxi=1.0, target=None,
@@ -72,11 +73,73 @@ class EnforceGCContent(Specification):
 
     def evaluate(self, problem):
         """Return the sum of breaches extent for all windowed breaches."""
-        wstart, wend = self.location.start, self.location.end
-        sequence = self.location.extract_sequence(problem.sequence)
+        if self.location.strand == -1:
+            sequence = self.location.extract_sequence(problem.sequence)
+        else:
+            wstart, wend = self.location.start, self.location.end
+            sequence = problem.sequence_array[wstart: wend]
         gc = gc_content(sequence, window_size=self.window)
         breaches = (np.maximum(0, self.mini - gc) +
                     np.maximum(0, gc - self.maxi))
+        return self.evaluation_from_breaches(problem, breaches)
+
+    def passes(self, problem):
+        """Return True iff all windows are within the GC content bounds."""
+        if self.location.strand == -1:
+            sequence = self.location.extract_sequence(problem.sequence)
+        else:
+            wstart, wend = self.location.start, self.location.end
+            sequence = problem.sequence_array[wstart: wend]
+        gc = gc_content(sequence, window_size=self.window)
+        return bool(np.all(gc >= self.mini) and np.all(gc <= self.maxi))
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Only recompute the GC content of windows overlapping the changes.
+        """
+        wstart, wend = self.location.start, self.location.end
+        if ((self.window is None) or (self.location.strand == -1) or
+                ('breaches' not in previous_evaluation.data)):
+            return self.evaluate(problem)
+        last_window_start = wend - self.window
+        breaches = previous_evaluation.data['breaches']
+        for start, end in changed_segments:
+            start = max(wstart, start - self.window + 1)
+            end = min(last_window_start, end - 1)
+            if start > end:
+                continue
+            if breaches is previous_evaluation.data['breaches']:
+                breaches = breaches.copy()
+            subsequence = problem.sequence_array[start: end + self.window]
+            gc = gc_content(subsequence, window_size=self.window)
+            breaches[start - wstart: end - wstart + 1] = (
+                np.maximum(0, self.mini - gc) + np.maximum(0, gc - self.maxi))
+        if breaches is previous_evaluation.data['breaches']:
+            return previous_evaluation
+        return self.evaluation_from_breaches(problem, breaches)
+
+    def score_upper_bound(self, problem, free_segment):
+        """Return minus the breaches of the windows outside the free segment.
+        """
+        free_start, free_end = free_segment
+        wstart, wend = self.location.start, self.location.end
+        if (free_start >= wend) or (free_end <= wstart):
+            return self.evaluate(problem).score
+        if self.window is None:
+            return self.best_possible_score
+        score = 0
+        for start, end in [(wstart, min(wend, free_start)),
+                           (max(wstart, free_end), wend)]:
+            if end - start >= self.window:
+                sequence = problem.sequence_array[start: end]
+                gc = gc_content(sequence, window_size=self.window)
+                score -= (np.maximum(0, self.mini - gc) +
+                          np.maximum(0, gc - self.maxi)).sum()
+        return score
+
+    def evaluation_from_breaches(self, problem, breaches):
+        """Return the SpecEvaluation for the given array of window breaches.
+        """
+        wstart, wend = self.location.start, self.location.end
         score = - breaches.sum()
         breaches_starts = wstart + (breaches > 0).nonzero()[0]
 
@@ -106,7 +169,12 @@ class EnforceGCContent(Specification):
                        ", ".join([str(l) for l in breaches_locations]))
         return SpecEvaluation(self, problem, score,
                               locations=breaches_locations,
-                              message=message)
+                              message=message,
+                              data=dict(breaches=breaches))
+
+    def localization_region(self):
+        """Return the location, or None if there is no window."""
+        return None if (self.window is None) else self.location
 
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the GC content evaluation.
@@ -4,10 +4,10 @@ from ..Specification import Specification
 from .VoidSpecification import VoidSpecification
 from ..SpecEvaluation import SpecEvaluation
 from .EnforceSequence import EnforceSequence
-from ..MutationSpace import MutationSpace
 from ..SequencePattern import DnaNotationPattern, enzyme_pattern
 from dnachisel.Location import Location
-from ..DnaOptimizationProblem import DnaOptimizationProblem, NoSolutionError
+from ..DnaOptimizationProblem import LocalProblem, NoSolutionError
+from proglog import MuteProgressBarLogger
 
 
 class EnforcePatternOccurence(Specification):
@@ -35,6 +35,7 @@ class EnforcePatternOccurence(Specification):
     """
 
     best_possible_score = 0
+    cacheable = True
     priority = -1
     genbank_args = ('pattern', 'occurences')
 
@@ -83,6 +84,10 @@ class EnforcePatternOccurence(Specification):
             data=dict(matches=matches)
         )
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Localize the evaluation."""
         new_location = self.location.overlap_region(location)
@@ -107,25 +112,44 @@ class EnforcePatternOccurence(Specification):
             new_location = Location(start, start + L, self.location.strand)
             new_constraint = EnforceSequence(sequence=self.pattern.sequence,
                                              location=new_location)
-            new_space = MutationSpace.from_optimization_problem(
-                problem, new_constraints=[new_constraint])
-            if len(new_space.unsolvable_segments) > 0:
+            new_space = problem.mutation_space.with_added_restrictions(
+                new_constraint.restrict_nucleotides(problem.sequence_state))
+            # The restriction is percolated with the choices it overlaps, so
+            # the restricted choices are in the span of these choices.
+            span = [start, start + L]
+            for choice in problem.mutation_space.choices_in(start, start + L):
+                span = [min(span[0], choice.start), max(span[1], choice.end)]
+            span = tuple(span)
+            restricted_choices = new_space.choices_in(*span)
+            if any(len(choice.variants) == 0
+                   for choice in restricted_choices):
                 continue
-            new_sequence = new_space.constrain_sequence(problem.sequence)
-            new_constraints = problem.constraints + [new_constraint]
-            new_problem = DnaOptimizationProblem(
-                sequence=new_sequence,
-                constraints=new_constraints,
-                mutation_space=new_space,
-                logger=None
+            # The new problem shares the sequence of the current problem. The
+            # insertion only mutates the restricted choices, so only their
+            # span is saved, and restored on failure.
+            span_before = problem.sequence_state[span[0]: span[1]]
+            problem.sequence_state.apply_mutations([
+                (choice.segment, sorted(choice.variants)[0])
+                for choice in restricted_choices
+                if (problem.sequence_state[choice.start: choice.end]
+                    not in choice.variants)
+            ])
+            problem.sequence_state.commit()
+            new_problem = LocalProblem(
+                parent=problem,
+                constraints=problem.constraints + [new_constraint],
+                mutation_space=new_space
             )
+            new_problem.logger = MuteProgressBarLogger()
             assert self.evaluate(new_problem).passes
             try:
                 new_problem.resolve_constraints()
-                problem.sequence = new_problem.sequence
                 return
             except NoSolutionError:
-                pass
+                problem.sequence_state.apply_mutations([
+                    (span, span_before)
+                ])
+                problem.sequence_state.commit()
         raise NoSolutionError(
             problem=problem, location=self.location,
             message='Insertion of pattern %s in %s failed' % (
@@ -50,6 +50,11 @@ class EnforceRegionsCompatibility(Specification):
             message=message
         )
 
+    def localization_region(self):
+        """Return the span of all the locations (see Specification)."""
+        return Location(min(l.start for l in self.locations),
+                        max(l.end for l in self.locations))
+
     def localized(self, location, problem=None):
         if any(location.overlap_region(rl) for rl in self.locations):
             return self
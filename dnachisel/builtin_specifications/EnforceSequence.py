@@ -29,6 +29,7 @@ class EnforceSequence(Specification):
     """
     localization_interval_length = 6  # used when optimizing
     best_possible_score = 0
+    cacheable = True
     enforced_by_nucleotide_restrictions = True
 
     def __init__(self, sequence=None, location=None, boost=1.0):
@@ -77,6 +78,10 @@ class EnforceSequence(Specification):
         return SpecEvaluation(self, problem, score=-len(discrepancies),
                               locations=locations)
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None):
         """Localize the spec to the overlap of its location and the new."""
         start, end = location.start, location.end
@@ -34,6 +34,7 @@ class EnforceTranslation(CodonSpecification):
     """
 
     best_possible_score = 0
+    cacheable = True
     codons_sequences = CODONS_SEQUENCES
     enforced_by_nucleotide_restrictions = True
     codons_translations = "Bacterial"
@@ -104,6 +105,28 @@ class EnforceTranslation(CodonSpecification):
             for ind in range(len(translation))
             if translation[ind] != self.translation[ind]
         ]
+        return self.evaluation_from_errors(problem, errors)
+
+    def evaluate_delta(self, problem, changed_segments, previous_evaluation):
+        """Only re-translate the codons overlapping the changed segments."""
+        if ((self.location is None) or
+                ('errors' not in previous_evaluation.data)):
+            return self.evaluate(problem)
+        indices = self.changed_codons_indices(changed_segments)
+        if indices == []:
+            return previous_evaluation
+        errors = set(previous_evaluation.data['errors'])
+        for ind in indices:
+            codon = self.extract_codon(problem.sequence, ind)
+            if translate(codon, self.codons_translations) != \
+                    self.translation[ind]:
+                errors.add(ind)
+            else:
+                errors.discard(ind)
+        return self.evaluation_from_errors(problem, sorted(errors))
+
+    def evaluation_from_errors(self, problem, errors):
+        """Return the evaluation for a list of wrongly-translated codons."""
         errors_locations = [
             Location(3 * ind, 3 * (ind + 1)) if self.location.strand >= 0 else
             Location(start=self.location.end - 3 * (ind + 1),
@@ -115,7 +138,8 @@ class EnforceTranslation(CodonSpecification):
         return SpecEvaluation(self, problem, score=-len(errors),
                               locations=errors_locations,
                               message="All OK." if success else
-                              "Wrong translation at indices %s" % errors)
+                              "Wrong translation at indices %s" % errors,
+                              data=dict(errors=errors))
 
     def localized_on_window(self, new_location, start_codon, end_codon):
         new_translation = self.translation[start_codon:end_codon]
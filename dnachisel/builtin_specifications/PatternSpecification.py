@@ -50,6 +50,10 @@ class PatternSpecification(Specification):
             result = self
         return result
 
+    def localization_region(self):
+        """Return the specification's location (see Specification)."""
+        return self.location
+
     def localized(self, location, problem=None, with_righthand=True):
         """Localize the pattern to the given location. Taking into account the
         specification's own location, and the size of the pattern."""
@@ -23,3 +23,16 @@ def test_avoid_pattern_overlapping_locations():
     problem.resolve_constraints()
     assert problem.all_constraints_pass()
     assert "A" not in problem.sequence[1:-1]
+
+def test_avoid_pattern_with_batched_random_search():
+    numpy.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(10000, seed=123),
+        constraints=[AvoidPattern(enzyme="BsaI")],
+        logger=None
+    )
+    problem.randomization_threshold = 0  # always use the random search
+    problem.random_batch_size = 5
+    assert not problem.all_constraints_pass()
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
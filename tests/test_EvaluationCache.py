@@ -0,0 +1,45 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, EnforceGCContent, AvoidNonuniqueSegments,
+                       EvaluationCache, Location, complement)
+
+
+def test_evaluation_cache_hits_and_misses():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(1000, seed=123),
+        constraints=[EnforceGCContent(mini=0.4, maxi=0.6, window=50),
+                     AvoidNonuniqueSegments(8)],
+        logger=None)
+    cache = EvaluationCache(max_size=2)
+    gc_spec = problem.constraints[0].localized(Location(100, 200))
+    evaluation = cache.evaluate(gc_spec, problem)
+    assert (cache.hits, cache.misses) == (0, 1)
+    # A copy localized at the same location shares the cached evaluation.
+    same_spec = problem.constraints[0].localized(Location(100, 200))
+    assert cache.evaluate(same_spec, problem) is evaluation
+    assert cache.passes(same_spec, problem) == evaluation.passes
+    assert (cache.hits, cache.misses) == (2, 1)
+    # Changes other than the location give a different specification.
+    other_spec = gc_spec.copy_with_changes(mini=0.1)
+    assert cache.evaluate(other_spec, problem).score == 0
+    assert (cache.hits, cache.misses) == (2, 2)
+    # Mutating the subsequence gives a cache miss.
+    new_subsequence = complement(problem.sequence[150:152])
+    problem.sequence_state.apply_mutations([((150, 152), new_subsequence)])
+    cache.evaluate(gc_spec, problem)
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert len(cache) == 2  # max_size reached, least recent entry removed
+    # Specifications which are not cacheable are not counted.
+    cache.evaluate(problem.constraints[1], problem)
+    assert (cache.hits, cache.misses) == (2, 3)
+
+
+def test_problem_evaluation_cache():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(3000, seed=123),
+        constraints=[AvoidPattern(enzyme="BsmBI"),
+                     EnforceGCContent(mini=0.3, maxi=0.7, window=50)],
+        logger=None)
+    problem.randomization_threshold = 0
+    problem.resolve_constraints()
+    assert problem.all_constraints_pass()
+    assert problem.evaluation_cache.misses > 0
@@ -0,0 +1,24 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, Location)
+from dnachisel.DnaOptimizationProblem import LocalProblem
+
+
+def test_local_problem_shares_parent_sequence():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(1000, seed=123),
+        constraints=[AvoidPattern("ATTA")], logger=None)
+    problem.max_random_iters = 123
+    location = Location(100, 120)
+    local_problem = LocalProblem(
+        parent=problem,
+        constraints=[c.localized(location) for c in problem.constraints],
+        mutation_space=problem.mutation_space.localized(location))
+    assert local_problem.sequence_state is problem.sequence_state
+    assert local_problem.logger is problem.logger
+    assert local_problem.max_random_iters == 123
+    sequence_before = problem.sequence
+    local_problem.sequence_state.apply_mutations([((105, 108), "GGG")])
+    local_problem.sequence_state.commit()
+    assert problem.sequence[105:108] == "GGG"
+    local_problem.restore_window()
+    assert problem.sequence == sequence_before
@@ -1,3 +1,4 @@
+import numpy as np
 from dnachisel.MutationSpace import MutationChoice, MutationSpace
 
 
@@ -29,6 +30,15 @@ def test_mutation_choice_extract_varying_region():
     choices = choice.extract_varying_region()
     assert [c.segment for c in choices] == [(5, 6), (6, 12)]
 
+def test_mutation_choice_split_independent_segments():
+    choice = MutationChoice((5, 10), ['ATTTC', 'TGTTC', 'ATTTA', 'TGTTA'])
+    choices = choice.split_independent_segments()
+    assert [(c.segment, set(c.variants)) for c in choices] == [
+        ((5, 7), {'AT', 'TG'}), ((7, 8), {'T'}), ((8, 9), {'T'}),
+        ((9, 10), {'A', 'C'})]
+    choice = MutationChoice((5, 8), ['ATT', 'TGC', 'AGC'])
+    assert choice.split_independent_segments() == [choice]
+
 def test_mutation_choice_io():
     choice = MutationChoice((5, 12), [
         'ATGCGTG',
@@ -47,3 +57,113 @@ def test_mutation_space():
     loc, seq = space.pick_random_mutations(n_mutations=1, sequence='ATTTC')[0]
     assert loc in [loc1, loc2]
     assert seq in (seqs1 + seqs2)
+
+def test_localized_mutation_space_stores_only_window():
+    c1 = MutationChoice((0, 2), ['AT', 'TG'])
+    c2 = MutationChoice((2, 5), ['TTC', 'TTA', 'TTT'])
+    c3 = MutationChoice((5, 6), ['A', 'C'])
+    space = MutationSpace([c1, c1, c2, c2, c2, c3, None, None])
+    localized = space.localized((2, 6))
+    assert localized.offset == 2
+    assert localized.choices_window == [c2, c2, c2, c3]
+    assert localized.choices_index == [None, None, c2, c2, c2, c3]
+    assert localized.choices_list == [c2, c3]
+    assert localized.localized((4, 20)).choices_list == [c2, c3]
+    assert localized.localized((0, 1)).choices_list == []
+
+def test_compact_mutation_space_from_problem():
+    from dnachisel import DnaOptimizationProblem, EnforceTranslation
+    problem = DnaOptimizationProblem(
+        sequence='ATGAAATTT' + 30 * 'A',
+        constraints=[EnforceTranslation(location=(0, 9))],
+        logger=None)
+    space = problem.mutation_space
+    # The 30 unconstrained nucleotides need no table entries.
+    assert len(space.choices_table) < 9
+    assert len(space.choices_list) == len(space.choices_in(0, 39))
+    assert [c.segment for c in space.choices_list[-2:]] == [(37, 38),
+                                                            (38, 39)]
+    assert all(len(c.variants) == 4 for c in space.choices_list[-30:])
+    assert space.choices_index[20].segment == (20, 21)
+    localized = space.localized((30, 39))
+    assert [c.start for c in localized.multichoices] == list(range(30, 39))
+    variants_id = space.choices_table.variants_ids[0]
+    variants_array = space.choices_table.variants_array(variants_id)
+    assert variants_array.dtype == 'uint8'
+
+def test_mutation_sampler():
+    import numpy as np
+    from dnachisel.MutationSpace import MutationSampler
+    choices = [MutationChoice((i, i + 1), 'ACGT') for i in range(10)]
+    sequence = 'AAAAACCCCC'
+
+    def draw_many(seed):
+        sampler = MutationSampler(choices)
+        generator = np.random.default_rng(seed)
+        return [sampler.draw(3, sequence, random_generator=generator)
+                for i in range(500)]
+
+    proposals = draw_many(123)
+    assert proposals == draw_many(123)
+    for mutations in proposals:
+        assert len(set(segment for segment, v in mutations)) == 3
+        for (start, end), variant in mutations:
+            assert variant != sequence[start]
+    drawn_starts = set(s for m in proposals for ((s, e), v) in m)
+    assert drawn_starts == set(range(10))
+
+def test_all_variants_gray_code():
+    from dnachisel.SequenceState import SequenceState
+    choices = [MutationChoice((0, 1), 'AC'),
+               MutationChoice((1, 3), ['GG', 'TT', 'CA']),
+               MutationChoice((3, 4), 'ACG')]
+    space = MutationSpace([choices[0], choices[1], choices[1], choices[2]])
+    state = SequenceState('TTTT')
+    previous, variants = None, []
+    for variant, changed_segment in space.all_variants_gray_code(state):
+        variants.append(variant.sequence)
+        if previous is not None:
+            differences = [i for i in range(4)
+                           if variant.sequence[i] != previous[i]]
+            assert changed_segment[0] <= min(differences)
+            assert max(differences) < changed_segment[1]
+        previous = variant.sequence
+    assert len(variants) == len(set(variants)) == 18
+    assert state.sequence == 'TTTT'
+
+def test_mutation_choice_percolate_with():
+    others = [MutationChoice((0, 3), {'GTA', 'GCT', 'GTT'}),
+              MutationChoice((3, 4), {'A', 'T'}),
+              MutationChoice((4, 7), {'ATG', 'ACC', 'CTG'})]
+    choice = MutationChoice((2, 5), {'ATA', 'TTA', 'AAC'})
+    percolated = choice.percolate_with(others)
+    assert percolated.segment == (0, 7)
+    assert percolated.variants == {'GTATACC', 'GTATATG', 'GCTTACC',
+                                   'GCTTATG', 'GTTTACC', 'GTTTATG',
+                                   'GTAACTG'}
+    # Candidates which are not entirely covered by the others are dropped.
+    choice = MutationChoice((2, 8), {'AAACCG'})
+    assert choice.percolate_with(others).variants == set()
+
+def test_log_space_size():
+    choice = MutationChoice((0, 1), 'ACGT')
+    space = MutationSpace(1000 * [choice, None, None])
+    assert abs(space.log_space_size - 1000 * np.log10(4)) < 1e-6
+    assert space.space_size == np.inf
+    assert MutationSpace([None, None]).log_space_size == -np.inf
+
+def test_with_added_restrictions():
+    c1 = MutationChoice((0, 2), {'AT', 'TG', 'GG'})
+    c2 = MutationChoice((2, 5), {'TTC', 'TTA', 'CAT'})
+    space = MutationSpace([c1, c1, c2, c2, c2, None])
+    choice_ids = space.choice_ids.copy()
+    restricted = space.with_added_restrictions([((1, 3), {'GT', 'TT'})])
+    assert restricted.choice_ids is not space.choice_ids
+    assert (space.choice_ids == choice_ids).all()
+    # The percolated choice (0-5) is split into independent segments.
+    assert [(c.segment, set(c.variants)) for c in restricted.choices_list] \
+        == [((0, 2), {'AT', 'TG', 'GG'}), ((2, 3), {'T'}), ((3, 4), {'T'}),
+            ((4, 5), {'A', 'C'})]
+    restricted = restricted.with_added_restrictions([((6, 7), {'C'})])
+    assert restricted.window == (0, 7)
+    assert restricted.choices_in(6, 7)[0].variants == {'C'}
@@ -0,0 +1,45 @@
+import os
+
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, AvoidChanges, EnforceTranslation,
+                       MutationSpaceCache)
+from dnachisel.MutationSpace import MutationSpace
+
+
+def test_mutation_space_to_file_and_from_file(tmpdir):
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(300, seed=123),
+        constraints=[AvoidChanges((0, 50)), EnforceTranslation((90, 210))],
+        logger=None)
+    filepath = os.path.join(str(tmpdir), 'space.npz')
+    problem.mutation_space.to_file(filepath)
+    space = MutationSpace.from_file(filepath)
+    assert (space.choice_ids == problem.mutation_space.choice_ids).all()
+    assert [(c.segment, set(c.variants)) for c in space.choices_list] == [
+        (c.segment, set(c.variants))
+        for c in problem.mutation_space.choices_list
+    ]
+
+
+def test_mutation_space_cache(tmpdir):
+    sequence = random_dna_sequence(300, seed=123)
+    cache = MutationSpaceCache(os.path.join(str(tmpdir), 'cache'))
+
+    def new_problem(constraints):
+        return DnaOptimizationProblem(sequence=sequence,
+                                      constraints=constraints,
+                                      mutation_space_cache=cache,
+                                      logger=None)
+
+    problem = new_problem([AvoidChanges((0, 50)),
+                           EnforceTranslation((90, 210))])
+    assert (cache.hits, cache.misses) == (0, 1)
+    # Constraints which do not restrict nucleotides are not in the key.
+    same_problem = new_problem([AvoidChanges((0, 50)),
+                                EnforceTranslation((90, 210)),
+                                AvoidPattern(enzyme='BsmBI')])
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert (same_problem.mutation_space.choice_ids ==
+            problem.mutation_space.choice_ids).all()
+    new_problem([AvoidChanges((0, 60)), EnforceTranslation((90, 210))])
+    assert (cache.hits, cache.misses) == (1, 2)
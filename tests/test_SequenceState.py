@@ -0,0 +1,28 @@
+from dnachisel.SequenceState import SequenceState
+from dnachisel import DnaOptimizationProblem
+from dnachisel.biotools import gc_content
+
+
+def test_sequence_state_apply_and_revert():
+    state = SequenceState("ATTGCCA")
+    state.apply_mutations([((1, 3), "GC")])
+    assert state.sequence == "AGCGCCA"
+    state.apply_mutations([((0, 1), "T"), ((6, 7), "T")])
+    assert state[:3] == "TGC"
+    assert state.sequence == "TGCGCCT"
+    state.revert()
+    assert state.sequence == "AGCGCCA"
+    state.commit()
+    assert state.journal == []
+    state.apply_mutations([((1, 2), "T")])
+    state.revert()
+    assert state.sequence == "AGCGCCA"
+
+
+def test_problem_sequence_array_is_shared():
+    problem = DnaOptimizationProblem("ATTGCCAATT", logger=None)
+    array = problem.sequence_array
+    problem.sequence_state.apply_mutations([((0, 2), "GG")])
+    assert problem.sequence == "GGTGCCAATT"
+    assert array[0] == ord("G")
+    assert gc_content(problem.sequence_array[:4]) == 0.75
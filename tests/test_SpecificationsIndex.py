@@ -0,0 +1,28 @@
+import numpy as np
+from dnachisel import (AvoidPattern, AvoidNonuniqueSegments, EnforceGCContent,
+                       Location)
+from dnachisel.SpecificationsIndex import SpecificationsIndex
+
+
+def test_specifications_index_overlapping():
+    np.random.seed(123)
+    specifications = [AvoidNonuniqueSegments(8)]  # no location: global
+    for start in np.random.randint(0, 10000, 300):
+        end = start + np.random.randint(1, 500)
+        specifications.append(AvoidPattern("ATTA", location=(start, end)))
+    specifications.append(EnforceGCContent(0.4, 0.6, location=(0, 100)))
+    index = SpecificationsIndex(specifications)
+    assert index.is_index_of(specifications)
+    for start in np.random.randint(0, 10000, 100):
+        location = Location(start, start + 20)
+        expected = [
+            spec for spec in specifications
+            if (spec.localization_region() is None) or
+            (spec.location.overlap_region(location) is not None)
+        ]
+        result = index.overlapping(location)
+        assert all(spec in result for spec in expected)
+        for spec in result:  # other results must touch the location
+            region = spec.localization_region()
+            assert (spec in expected) or (region.start == location.end) or (
+                region.end == location.start)
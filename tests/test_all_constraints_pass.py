@@ -0,0 +1,25 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, EnforceGCContent, AvoidHairpins,
+                       AvoidNonuniqueSegments)
+
+
+def test_all_constraints_pass_agrees_with_evaluations():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(1000, seed=123),
+        constraints=[
+            AvoidNonuniqueSegments(8),
+            AvoidHairpins(stem_size=8, hairpin_window=200),
+            EnforceGCContent(mini=0.3, maxi=0.7, window=50),
+            AvoidPattern("GCNNNNNGC")
+        ], logger=None)
+    for seed in range(10):
+        problem.sequence = random_dna_sequence(1000, seed=seed)
+        for constraint in problem.constraints:
+            assert constraint.passes(problem) == (
+                constraint.evaluate(problem).passes)
+        assert problem.all_constraints_pass() == (
+            problem.constraints_evaluations().all_evaluations_pass())
+    # The always-failing pattern constraint should now be tested first.
+    assert problem.constraints_stats['AvoidPattern'][1] > 0
+    order = sorted(problem.constraints, key=problem._constraint_cost)
+    assert isinstance(order[0], AvoidPattern)
@@ -0,0 +1,45 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       reverse_translate, random_protein_sequence,
+                       AvoidPattern, EnforceGCContent, AvoidHairpins,
+                       AvoidNonuniqueSegments, CodonOptimize,
+                       EnforceTranslation)
+import numpy
+
+
+def evaluations_are_equal(ev1, ev2):
+    def locations(ev):
+        return sorted([
+            loc.to_tuple() if hasattr(loc, 'to_tuple') else loc
+            for loc in (ev.locations or [])
+        ])
+    return (ev1.score == ev2.score) and (locations(ev1) == locations(ev2))
+
+
+def test_evaluate_delta_equals_evaluate():
+    numpy.random.seed(123)
+    sequence = (random_dna_sequence(1500, seed=123) +
+                reverse_translate(random_protein_sequence(100, seed=123)))
+    specifications = [
+        AvoidPattern(enzyme="BsaI"),
+        AvoidPattern("NNGCNN"),
+        EnforceGCContent(mini=0.45, maxi=0.55, window=50),
+        AvoidHairpins(stem_size=6, hairpin_window=100),
+        AvoidNonuniqueSegments(6),
+        CodonOptimize(species='e_coli', location=(1500, 1800)),
+        CodonOptimize(species='e_coli', location=(1500, 1800, -1)),
+        EnforceTranslation(location=(1500, 1800)),
+        EnforceTranslation(location=(1500, 1800, -1)),
+    ]
+    problem = DnaOptimizationProblem(sequence=sequence,
+                                     objectives=specifications, logger=None)
+    evaluations = problem.objectives_evaluations()
+    for i in range(30):
+        mutations = problem.mutation_space.pick_random_mutations(
+            n_mutations=3, sequence=problem.sequence)
+        problem.sequence = problem.mutation_space.apply_mutations(
+            mutations, problem.sequence)
+        evaluations = problem.objectives_evaluations(
+            changed_segments=[segment for segment, _ in mutations],
+            previous_evaluations=evaluations)
+        for evaluation, spec in zip(evaluations, problem.objectives):
+            assert evaluations_are_equal(evaluation, spec.evaluate(problem))
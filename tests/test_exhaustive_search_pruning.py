@@ -0,0 +1,76 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, EnforceGCContent, AvoidChanges,
+                       EnforceTranslation, CodonOptimize)
+
+
+def exhaustive_score_without_pruning(problem):
+    best_score = problem.objective_scores_sum()
+    for variant in problem.mutation_space.all_variants_in_place(
+            problem.sequence_state):
+        if problem.all_constraints_pass():
+            best_score = max(best_score, problem.objective_scores_sum())
+    return best_score
+
+
+def test_pruned_search_finds_first_solution():
+    sequence = 27 * "AT" + "AAAAAA"
+    problem = DnaOptimizationProblem(
+        sequence=sequence,
+        constraints=[AvoidPattern("AA"), AvoidChanges((0, 54)),
+                     EnforceGCContent(mini=0.5, maxi=0.7, window=6,
+                                      location=(54, 60))],
+        logger=None)
+    expected = None
+    for variant in problem.mutation_space.all_variants_in_place(
+            problem.sequence_state):
+        if problem.all_constraints_pass():
+            expected = variant.sequence
+            break
+    assert expected is not None
+    problem.sequence = sequence
+    problem.resolve_constraints_by_exhaustive_search()
+    assert problem.sequence == expected
+
+
+def test_branch_and_bound_finds_optimum():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(50, seed=123),
+        constraints=[AvoidPattern("ATG", location=(40, 50)),
+                     AvoidChanges((0, 44))],
+        objectives=[EnforceGCContent(mini=0.2, maxi=0.3, window=8),
+                    AvoidPattern("CC")],
+        logger=None)
+    expected_score = exhaustive_score_without_pruning(problem)
+    problem.optimize_by_exhaustive_search()
+    assert problem.objective_scores_sum() == expected_score
+
+
+def test_gray_code_search_finds_optimum():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(30, seed=123),
+        constraints=[AvoidChanges((0, 24)), EnforceTranslation((24, 30))],
+        objectives=[CodonOptimize(species='e_coli', location=(24, 30)),
+                    AvoidChanges((20, 30), boost=0.1)],
+        logger=None)
+    assert not problem.specifications_have_score_bounds()
+    expected_score = exhaustive_score_without_pruning(problem)
+    problem.optimize_by_exhaustive_search()
+    assert problem.objective_scores_sum() == expected_score
+
+
+def test_search_method_dispatch():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(60, seed=123),
+        constraints=[AvoidPattern("ATG"), AvoidChanges((0, 54))],
+        logger=None)
+    assert problem.choose_search_method() == 'backtracking'
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(3000, seed=123),
+        constraints=[AvoidPattern("ATG")],
+        logger=None)
+    assert problem.mutation_space.space_size == float('inf')
+    costs = problem.search_costs_estimates()
+    assert set(costs) == {'exhaustive', 'backtracking', 'random'}
+    method = problem.choose_search_method()
+    assert method in costs
+    assert problem.logger.state['search_method'] == method
@@ -0,0 +1,42 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       AvoidPattern, EnforceGCContent, AvoidNonuniqueSegments)
+import numpy
+
+
+def test_independent_locations_clusters():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(20000, seed=123),
+        constraints=[AvoidPattern(enzyme="BsaI"),
+                     EnforceGCContent(mini=0.3, maxi=0.7, window=50)],
+        logger=None)
+    constraint = problem.constraints[0]
+    locations = sorted(constraint.evaluate(problem).locations)
+    clusters = problem.independent_locations_clusters(constraint, locations)
+    assert 1 < len(clusters) <= len(locations)
+    assert sum(len(locs) for locs, segment in clusters) == len(locations)
+    segments = [segment for locs, segment in clusters]
+    for (start1, end1), (start2, end2) in zip(segments, segments[1:]):
+        assert end1 + 50 <= start2
+
+    # Non-local constraints make all breaches interdependent
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(5000, seed=123),
+        constraints=[AvoidPattern(enzyme="BsaI"), AvoidNonuniqueSegments(8)],
+        logger=None)
+    constraint = problem.constraints[0]
+    locations = sorted(constraint.evaluate(problem).locations)
+    clusters = problem.independent_locations_clusters(constraint, locations)
+    assert len(clusters) == 1
+
+
+def test_resolve_constraints_in_parallel():
+    numpy.random.seed(123)
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(20000, seed=123),
+        constraints=[AvoidPattern(enzyme="BsaI"),
+                     AvoidPattern(enzyme="BsmBI"),
+                     EnforceGCContent(mini=0.3, maxi=0.7, window=50)],
+        logger=None)
+    assert not problem.all_constraints_pass()
+    problem.resolve_constraints(n_jobs=2)
+    assert problem.all_constraints_pass()
@@ -0,0 +1,36 @@
+from dnachisel import (DnaOptimizationProblem, random_dna_sequence,
+                       EnforceGCContent, AvoidPattern, SimulatedAnnealing,
+                       TabuSearch)
+import numpy
+
+
+def test_search_strategies():
+    for strategy in [SimulatedAnnealing(initial_temperature=0.5),
+                     TabuSearch(tabu_size=10)]:
+        numpy.random.seed(123)
+        problem = DnaOptimizationProblem(
+            sequence=random_dna_sequence(2000, seed=123),
+            constraints=[AvoidPattern(enzyme="BsaI")],
+            objectives=[EnforceGCContent(mini=0.4, maxi=0.45, window=80)],
+            logger=None
+        )
+        problem.search_strategy = strategy
+        problem.randomization_threshold = 0
+        problem.max_random_iters = 500
+        initial_score = problem.objective_scores_sum()
+        problem.resolve_constraints()
+        problem.optimize()
+        assert problem.all_constraints_pass()
+        assert problem.objective_scores_sum() > initial_score
+
+
+def test_max_random_time():
+    problem = DnaOptimizationProblem(
+        sequence=random_dna_sequence(500, seed=123),
+        objectives=[EnforceGCContent(mini=0.1, maxi=0.2, window=50)],
+        logger=None
+    )
+    problem.randomization_threshold = 0
+    problem.max_random_iters = 10 ** 8
+    problem.max_random_time = 0.2
+    problem.optimize()  # would take hours without max_random_time